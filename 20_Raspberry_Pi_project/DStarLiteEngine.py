@@ -0,0 +1,1411 @@
+#!/usr/bin/python3
+############################################################
+# Class DStarLiteEngine
+# This class implements the planning algorithm D* Lite
+# (see Sven Koenig, Maxim Likhachev, 2002) on a
+# two-dimensional grid of vertices (Class Vertex).
+# The engine does not depend on a view. All changes of
+# g- and rsh-values and colors are reported to an
+# optional observer (Class PlanObserver). The default
+# observer does nothing, so the engine can plan headless
+# e.g. on a server or on a Raspberry Pi without display.
+# Terrain costs, several robots, snapshots and the variants
+# of the search are described at their functions.
+#
+# File: DStarLiteEngine.py
+# Version: 1.0    Date: 18.10.2026
+###########################################################
+
+import array
+import json
+import struct
+import sys
+import time
+import vertex as vertex
+import priorityQueue as pq
+import heuristics
+import sparseGrid
+from planMetrics import PlanMetrics
+
+#Coordinate differences of straight and diagonal moves
+STRAIGHT_MOVES= frozenset(((0, 1), (0, -1), (1, 0), (-1, 0)))
+DIAGONAL_MOVES= frozenset(((1, 1), (1, -1), (-1, 1), (-1, -1)))
+
+#Available variants of ComputeShortestPath: name -> method of DStarLiteEngine
+algorithms= {'Basic': 'computeShortestPathLoop',
+             'Optimized': 'computeShortestPathOptimized',
+             'Jump points': 'computeShortestPathJump'}
+
+#Available storage of the vertices: 'Dense' creates all vertices with the
+#grid, 'Sparse' on the first access (see sparseGrid.py). Distance fields,
+#the wavefront and snapshots set every cell and create all vertices.
+gridTypes= ('Dense', 'Sparse')
+
+#Status of computeShortestPathBudget
+DONE= 'done' #Search finished, a path exists
+NEEDS_MORE= 'needs more' #Budget used up, call again to continue
+NO_PATH= 'no path' #Search finished, no path exists
+
+#Loops between two time checks of computeShortestPathBudget
+BUDGET_CHUNK= 32
+
+#Snapshot format (see DStarLiteEngine.snapshot): magic, version, size of
+#the JSON header with the scalar state, then the arrays in native byte order
+SNAPSHOT_MAGIC= b'DSLS'
+SNAPSHOT_VERSION= 1
+SNAPSHOT_HEADER= struct.Struct('<4sHI')
+
+class PlanObserver(object):
+
+    #Called when the g-value of vertex x,y has changed
+    def update_g(self, x, y):
+        pass
+
+    #Called when the rsh-value of vertex x,y has changed
+    def update_rsh(self, x, y):
+        pass
+
+    #Called when a vertex should be shown in another color
+    def updateColor(self, aVertex, aColor):
+        pass
+
+    #Called after each loop of the ComputeShortestPath function
+    def planStepDone(self):
+        pass
+
+    #Called when Anytime D* has published a path (see useAnytime): its
+    #costs are at most epsilon times the optimal costs
+    def pathPublished(self, epsilon):
+        pass
+
+
+class DStarLiteEngine(object):
+
+    #Create a new initialized DStarLiteEngine with a vertexgrid
+    #queueType selects the priority queue implementation (see priorityQueue.queueTypes)
+    #observer receives all changes of the planning state (default: no observer)
+    #vertexType selects the vertex implementation (see vertex.vertexTypes)
+    #metrics collects counters and events (default: counters only, see planMetrics.py)
+    #algorithm selects the variant of ComputeShortestPath (see algorithms)
+    #heuristic selects the heuristic if hIsZero is False (see heuristics.heuristicTypes,
+    #default: Manhattan for 4 neighbors, Octile for 8 neighbors)
+    #gridType selects the storage of the vertices (see gridTypes)
+    def __init__(self, gridWidth=5, gridHeight= 4, hIsZero= True, directNeighbors=False,
+                 queueType='Indexed heap', observer=None, vertexType='Standard', metrics=None,
+                 algorithm='Basic', heuristic=None, gridType='Dense'):
+        if observer is None:
+            observer= PlanObserver()
+        self.observer= observer
+        if metrics is None:
+            metrics= PlanMetrics()
+        self.metrics= metrics
+        self.width= gridWidth
+        self.height= gridHeight
+        self.directNeighbors= directNeighbors # false=8, true=4
+        if vertexType not in vertex.vertexTypes:
+            raise Exception('Unknown vertex type: ' + str(vertexType))
+        vertexClass= vertex.vertexTypes[vertexType]
+        if algorithm not in algorithms:
+            raise Exception('Unknown algorithm: ' + str(algorithm))
+        self.algorithm= algorithm
+        if gridType not in gridTypes:
+            raise Exception('Unknown grid type: ' + str(gridType))
+        self.gridType= gridType
+        if gridType == 'Sparse':
+            self.vertexGrid= sparseGrid.SparseVertexGrid(vertexClass, gridWidth, gridHeight)
+        else:
+            self.vertexGrid = [[vertexClass(x,y) for y in range(gridHeight)] for x in range(gridWidth)]
+        self.adjacency= None #Neighbor table, see buildAdjacency
+        print("Creating vertex grid with height:", gridHeight, "and width:", gridWidth, "\n")
+        self.startCoordinates= [float('inf'),float('inf')]
+        self.goalCoordinates= [float('inf'),float('inf')]
+        self.obstacles= set()
+        self.startNode= None
+        self.goalNode= None
+        self.lastNode= None
+        self.robotNodes= None #Start vertices of several robots, see setRobots
+        self.lastRobotNodes= None
+        self.distanceFields= None #FieldStore with precomputed g-values, see useDistanceFields
+        self.wavefront= False #Bootstrap the first search with a wavefront, see useWavefront
+        self.pruning= False #Jump point pruning in the actual planning, see canPrune
+        self.anytime= False #Plan with Anytime D*, see useAnytime
+        self.initialEpsilon= 1.0 #Inflation of the heuristic of the first search
+        self.epsilonStep= 0.5 #Decrease of epsilon per search
+        self.timeBudget= None #Seconds for improving the path, None: until epsilon is 1
+        self.epsilon= 1.0 #Inflation of the heuristic of the actual search
+        self.closed= set() #Anytime D*: vertices expanded in the actual search
+        self.incons= set() #Anytime D*: inconsistent closed vertices for the next search
+        self.hIsZero= hIsZero
+        self.setHeuristic(heuristic)
+        self.baseHeuristic= None #Heuristic object of the actual planning
+        self.heuristic= None #Heuristic used for the keys (minimum for several robots)
+        self.priorityQueue= pq.createPriorityQueue(queueType)   #The priority queue U
+        self.planReady = False #True if a plan (= a path) is present
+        self.actualPath = [] #Sequence of vertices from start to goal
+        self.pathDirty= set() #Vertices with new g-value or terrain since the last path extraction
+        self.recolored= set() #Vertices colored by the planning since the last path extraction
+        self.planSteps= 0 #Loops of the last ComputeShortestPath
+
+    #Connectivity of the grid: False= 8 neighbors, True= 4 neighbors.
+    #Changing it invalidates the neighbor table.
+    @property
+    def directNeighbors(self):
+        return self._directNeighbors
+
+    @directNeighbors.setter
+    def directNeighbors(self, aBool):
+        self._directNeighbors= aBool
+        self.adjacency= None
+
+    #### Functions for the design of the grid ##################################################
+
+    def setStartCoordinates(self, x=0, y=0):
+        self.startCoordinates= [int(x),int(y)]
+        print("  New start coordinates:",self.startCoordinates)
+
+    def getStartCoordinates(self):
+        return self.startCoordinates
+
+    def setGoalCoordinates(self, x=0, y=0):
+        if self.goalCoordinates[0] != float('inf'):
+            #Old goal-node
+            vertex=self.vertexGrid[self.goalCoordinates[0]][self.goalCoordinates[1]]
+            vertex.setIsGoal(False)
+        self.goalCoordinates= [int(x),int(y)]
+        self.vertexGrid[self.goalCoordinates[0]][self.goalCoordinates[1]].setIsGoal(True)
+        print("  New goal coordinates:",self.goalCoordinates)
+
+    def getGoalCoordinates(self):
+        return self.goalCoordinates
+
+    def areStartAndGoalSet(self):
+        return (self.getStartCoordinates() != [float('inf'),float('inf')]) and \
+                self.getGoalCoordinates() != [float('inf'),float('inf')]
+
+    #Return the vertices of the grid: all vertices of a dense grid, the
+    #created ones of a sparse grid (the other cells have default values)
+    def vertices(self):
+        if self.gridType == 'Sparse':
+            return self.vertexGrid.vertices()
+        return (node for column in self.vertexGrid for node in column)
+
+    #Set or reset an obstacle at x,y before planning
+    def setObstacle(self, x, y, isObstacle=True):
+        node= self.vertexGrid[int(x)][int(y)]
+        node.isObstacle= isObstacle
+        if isObstacle:
+            self.obstacles.add(node)
+        else:
+            self.obstacles.discard(node)
+
+    #Set the terrain cost factor of vertex x,y before planning
+    def setCost(self, x, y, cost):
+        self.checkCost(cost)
+        self.vertexGrid[int(x)][int(y)].cost= cost
+
+    #Choose the heuristic (name of heuristics.heuristicTypes or None for the default)
+    def setHeuristic(self, heuristicName):
+        if heuristicName is not None and heuristicName not in heuristics.heuristicTypes:
+            raise Exception('Unknown heuristic: ' + str(heuristicName))
+        self.heuristicName= heuristicName
+
+    #Return the name of the heuristic used for planning: h = 0 overrides the
+    #chosen heuristic, the default depends on the connectivity
+    def heuristicType(self):
+        if self.hIsZero:
+            return 'Zero'
+        if self.heuristicName is not None:
+            return self.heuristicName
+        return 'Manhattan' if self.directNeighbors else 'Octile'
+
+    #Create and prepare the heuristic for the actual grid
+    def createHeuristic(self):
+        self.baseHeuristic= heuristics.createHeuristic(self.heuristicType())
+        self.baseHeuristic.prepare(self)
+        self.heuristic= self.baseHeuristic
+        if self.robotNodes is not None:
+            self.heuristic= heuristics.MultiStartHeuristic(self.baseHeuristic, self.robotNodes)
+
+    #Several robots drive to the same goal: set the vertices (x, y) of all
+    #robots. The first robot is the start vertex. During plan execution the
+    #robots keep their order and the new positions are used by the next
+    #applyChanges.
+    def setRobots(self, coordinates):
+        nodes= [self.vertexGrid[int(x)][int(y)] for x, y in coordinates]
+        if not nodes:
+            raise Exception('setRobots: at least one robot is needed')
+        self.robotNodes= nodes
+        self.startCoordinates= [nodes[0].x, nodes[0].y]
+
+    #Set start, goal, obstacles and terrain costs from a GridMap
+    #(see mapFile.py). The map must have the size of the grid.
+    def applyMap(self, gridMap):
+        if gridMap.width != self.width or gridMap.height != self.height:
+            raise Exception('Map size ' + str(gridMap.width) + 'x' + str(gridMap.height) +
+                            ' does not match the grid')
+        for x, y in gridMap.obstacleCoordinates():
+            self.setObstacle(x, y)
+        for x, y, cost in gridMap.costEntries():
+            self.setCost(x, y, cost)
+        if gridMap.start is not None:
+            self.setStartCoordinates(*gridMap.start)
+        if gridMap.goal is not None:
+            self.setGoalCoordinates(*gridMap.goal)
+
+    #Seed the planning with the distance fields of a FieldStore (see
+    #distanceFields.py, needs NumPy) if it has a field for the goal
+    def useDistanceFields(self, fieldStore):
+        self.distanceFields= fieldStore
+
+    #Bootstrap the first search after initializePlanning with a NumPy
+    #wavefront from the goal over the actual map (see distanceFields.py):
+    #all reachable vertices get their final g = rsh and the queue stays
+    #empty. Replanning repairs this state incrementally.
+    def useWavefront(self, aBool=True):
+        self.wavefront= aBool
+
+    #Return the distance field of the goal on the actual map
+    def wavefrontField(self):
+        import distanceFields
+        import mapFile
+        return distanceFields.computeField(mapFile.mapFromEngine(self), self.goalCoordinates,
+                                           self.directNeighbors)
+
+    #Plan with Anytime D* (see Maxim Likhachev et al., 2005): the heuristic in
+    #the keys of overconsistent vertices is inflated by epsilon >= 1, so a path
+    #with costs <= epsilon * optimal costs is found with few expansions and
+    #published at once. Then epsilon is decreased by epsilonStep toward 1 as
+    #long as timeBudget (seconds after the start of plan or applyChanges)
+    #allows. Every search continues with the g-values and the queue of the
+    #last one. After map changes the search starts again with epsilon.
+    def useAnytime(self, aBool=True, epsilon=2.5, epsilonStep=0.5, timeBudget=0.1):
+        if epsilon < 1 or epsilonStep <= 0:
+            raise Exception('Anytime D* needs epsilon >= 1 and a positive step')
+        self.anytime= aBool
+        self.initialEpsilon= epsilon
+        self.epsilonStep= epsilonStep
+        self.timeBudget= timeBudget
+        self.epsilon= 1.0
+
+    #Jump point pruning is used with the algorithm 'Jump points' if all
+    #terrain costs are 1: it relies on equal costs of symmetric paths
+    def canPrune(self):
+        return self.algorithm == 'Jump points' and not self.anytime and \
+               all(node.cost == 1 for node in self.vertices())
+
+    #A cost factor < 1 would make the heuristic overestimate
+    def checkCost(self, cost):
+        if not 1 <= cost < float('inf'):
+            raise Exception('Terrain cost must be >= 1 and finite: ' + str(cost))
+
+    ##### D* Lite Algorithm #############################################################
+
+    #Initialize the planning process. Function implements the "Initialize" procedure
+    #of the D*Lite algorithm.
+    def initializePlanning(self):
+        self.goalNode= self.vertexGrid[self.goalCoordinates[0]][self.goalCoordinates[1]]
+        self.k = 0.0
+        if self.adjacency is None:
+            self.buildAdjacency()
+        self.createHeuristic()
+        self.pruning= self.canPrune()
+        if self.algorithm == 'Jump points' and not self.pruning:
+            self.metrics.event('pruningDisabled', reason='terrain costs')
+        field= None
+        if self.distanceFields is not None:
+            field= self.distanceFields.find(self.width, self.height, self.goalCoordinates,
+                                            self.directNeighbors)
+        if field is None and self.wavefront:
+            field= self.wavefrontField()
+        if field is not None:
+            self.seedFromField(field)
+        else:
+            #All vertices have been already initialized with inf-value in vertex.py.
+            #Also the goal node's rsh value is already initialized with 0 in setGoalCoordinates
+            #Add now the inconsistent goal node into the priority queue.
+            key= self.queueKey(self.goalNode)
+            self.priorityQueue.insert(self.goalNode, key)
+            self.metrics.count('heapPush')
+        if self.metrics.tracing:
+            self.metrics.event('initializePlanning', start=(self.startNode.x, self.startNode.y),
+                               goal=(self.goalNode.x, self.goalNode.y))
+
+    #Initialize g and rsh of all vertices from a precomputed distance field
+    #(see distanceFields.py). The field is consistent for the map it was
+    #computed for. Vertices whose obstacle or terrain cost differs from
+    #that map are repaired with the edge-change rules like in applyChanges.
+    def seedFromField(self, field):
+        height= self.height
+        observer= self.observer
+        values= field.g.reshape(self.width, height)
+        obstacles= field.obstacle.reshape(self.width, height)
+        costs= field.cost.reshape(self.width, height) if field.cost is not None else None
+        oldStates= {}
+        for x, column in enumerate(self.vertexGrid):
+            columnCosts= costs[x].tolist() if costs is not None else [1] * height
+            for node, value, isObstacle, cost in zip(column, values[x].tolist(),
+                                                     obstacles[x].tolist(), columnCosts):
+                node.g= value
+                node.rsh= value
+                if value != float('inf'):
+                    observer.update_g(node.x, node.y)
+                    observer.update_rsh(node.x, node.y)
+                if node.isObstacle != (isObstacle != 0) or node.cost != cost:
+                    oldStates[node]= (isObstacle != 0, cost)
+        self.metrics.event('seedFromField', goal=tuple(field.goal), changed=len(oldStates))
+        self.updateChangedEdges(oldStates)
+
+    #Function implements the ComputeShortestPath function of the D*Lite algorithm.
+    #With several robots the loop continues until the vertex of every robot
+    #is settled: the keys do not depend on the robot, so this is one search.
+    def computeShortestPath(self):
+        with self.metrics.phase('computeShortestPath'):
+            loop= self.searchLoop()
+            if self.robotNodes is None:
+                loop()
+            else:
+                startNode= self.startNode
+                steps= 0
+                for node in self.robotNodes:
+                    self.startNode= node
+                    loop()
+                    steps+= self.planSteps
+                self.startNode= startNode
+                self.planSteps= steps
+
+    #Return the loop method of ComputeShortestPath for the actual mode
+    def searchLoop(self):
+        if self.anytime:
+            return self.computeShortestPathAnytime
+        return getattr(self, algorithms[self.algorithm])
+
+    #ComputeShortestPath with a budget of at most maxSteps loops and/or
+    #maxSeconds seconds (None: no limit). The whole state of the search is
+    #in the queue and the vertices, so the next call continues where the
+    #last one stopped. Return DONE or NO_PATH if the search is finished
+    #(planReady is set, showAndRemberPath extracts the path), NEEDS_MORE
+    #if the budget is used up. planSteps counts the loops of this call.
+    def computeShortestPathBudget(self, maxSteps=None, maxSeconds=None):
+        deadline= None if maxSeconds is None else time.perf_counter() + maxSeconds
+        steps= 0
+        finished= True
+        with self.metrics.phase('computeShortestPath'):
+            loop= self.searchLoop()
+            startNode= self.startNode
+            for node in (self.robotNodes if self.robotNodes is not None else [startNode]):
+                self.startNode= node
+                while True:
+                    stepLimit= BUDGET_CHUNK if deadline is not None else None
+                    if maxSteps is not None:
+                        rest= maxSteps - steps
+                        stepLimit= rest if stepLimit is None else min(stepLimit, rest)
+                    if stepLimit == 0:
+                        finished= False
+                        break
+                    done= loop(stepLimit)
+                    steps+= self.planSteps
+                    if done:
+                        break
+                    if deadline is not None and time.perf_counter() >= deadline:
+                        finished= False
+                        break
+                if not finished:
+                    break
+            self.startNode= startNode
+        self.planSteps= steps
+        if not finished:
+            return NEEDS_MORE
+        self.planReady= self.startNode.g != float('inf')
+        return DONE if self.planReady else NO_PATH
+
+    #The loop of the ComputeShortestPath function. It stops after stepLimit
+    #loops (None: no limit). Return True if the search is finished.
+    def computeShortestPathLoop(self, stepLimit=None):
+        counters= self.metrics.counters
+        tracing= self.metrics.tracing
+        self.planSteps=0  #counts loops of while-statement
+        while (self.priorityQueue.top_key() < self.startNode.calculateKey(self.startNode,self.k, \
+                                                                          self.heuristic)) or \
+                (self.startNode.rsh != self.startNode.g):
+            if self.planSteps == stepLimit:
+                return False
+            k_old= self.priorityQueue.top_key()
+            u= self.priorityQueue.pop()
+            counters['heapPop']+= 1
+            if tracing:
+                self.metrics.event('pop', x=u.x, y=u.y, key=k_old)
+            if not u in self.obstacles:
+                self.updateVertexColor(u, "white")
+            k= u.calculateKey(self.startNode, self.k, self.heuristic)
+            if k_old < k:
+                self.priorityQueue.insert(u, k)
+                counters['heapPush']+= 1
+                self.updateVertexColor(u, "yellow")
+            elif u.g > u.rsh:
+                u.g= u.rsh
+                self.pathDirty.add(u)
+                self.observer.update_g(u.x, u.y)
+                for pred, cost in self.adjacency[u.x][u.y]:
+                    self.updateVertex(pred)
+            else:
+                u.g= float('inf')
+                self.pathDirty.add(u)
+                self.observer.update_g(u.x, u.y)
+                for pred, cost in self.adjacency[u.x][u.y]:
+                    self.updateVertex(pred)
+                self.updateVertex(u)
+            self.planSteps+=1
+            counters['expansions']+= 1
+            self.observer.planStepDone()
+        return True
+
+    #The loop of the optimized ComputeShortestPath function (figure 4 of the
+    #paper): the key of the start vertex is only recalculated if its g- or
+    #rsh-value changed, keys are updated in the queue in place and the
+    #rsh-values of the predecessors are changed incrementally instead of
+    #recalculated from all their successors.
+    def computeShortestPathOptimized(self, stepLimit=None):
+        counters= self.metrics.counters
+        tracing= self.metrics.tracing
+        observer= self.observer
+        queue= self.priorityQueue
+        adjacency= self.adjacency
+        pathDirty= self.pathDirty
+        start= self.startNode
+        goal= self.goalNode
+        km= self.k
+        heuristic= self.heuristic
+        startG, startRsh= start.g, start.rsh
+        startKey= start.calculateKey(start, km, heuristic)
+        self.planSteps=0  #counts loops of while-statement
+        #Like the basic loop: stop only if the start vertex is consistent,
+        #so both variants leave the same g- and rsh-values
+        while queue.top_key() < startKey or start.rsh != start.g:
+            if self.planSteps == stepLimit:
+                return False
+            k_old= queue.top_key()
+            u= queue.top()
+            if tracing:
+                self.metrics.event('pop', x=u.x, y=u.y, key=k_old)
+            if not u in self.obstacles:
+                self.updateVertexColor(u, "white")
+            k= u.calculateKey(start, km, heuristic)
+            if k_old < k:
+                queue.update(u, k)
+                counters['heapUpdate']+= 1
+                self.updateVertexColor(u, "yellow")
+            elif u.g > u.rsh:
+                u.g= u.rsh
+                pathDirty.add(u)
+                observer.update_g(u.x, u.y)
+                queue.remove(u)
+                counters['heapPop']+= 1
+                gu= u.g
+                uCost= u.cost
+                for s, cost in adjacency[u.x][u.y]:
+                    counters['vertexUpdates']+= 1
+                    if s is not goal and not s.isObstacle and not u.isObstacle:
+                        value= cost * (s.cost + uCost) * 0.5 + gu
+                        if value < s.rsh:
+                            s.rsh= value
+                            observer.update_rsh(s.x, s.y)
+                    self.updateQueue(s)
+            else:
+                gOld= u.g
+                u.g= float('inf')
+                pathDirty.add(u)
+                observer.update_g(u.x, u.y)
+                uCost= u.cost
+                for s, cost in adjacency[u.x][u.y]:
+                    counters['vertexUpdates']+= 1
+                    #Only a predecessor whose rsh-value came from u is recalculated
+                    if s is not goal and s.rsh == cost * (s.cost + uCost) * 0.5 + gOld:
+                        s.rsh= self.calcRsh(s)
+                        observer.update_rsh(s.x, s.y)
+                    self.updateQueue(s)
+                #rsh(u) does not depend on g(u)
+                counters['vertexUpdates']+= 1
+                self.updateQueue(u)
+            if start.g != startG or start.rsh != startRsh:
+                startG, startRsh= start.g, start.rsh
+                startKey= start.calculateKey(start, km, heuristic)
+            self.planSteps+=1
+            counters['expansions']+= 1
+            observer.planStepDone()
+        return True
+
+    #The loop of ComputeShortestPath with jump point pruning (see Daniel
+    #Harabor, Alban Grastien, 2011) for uniform terrain costs. On open
+    #areas most vertices lie on several cheapest paths of the same cost.
+    #An overconsistent vertex only updates the neighbors which are not
+    #reached as cheaply without it from its parent: the natural and forced
+    #neighbors of its parent direction (see successorsInDirection). Along
+    #a straight line the next vertex is the only natural neighbor, so the
+    #line is settled without the queue up to a jump point (see jump). Only
+    #jump points are expanded from the queue. Underconsistent vertices
+    #update all neighbors like the basic loop, so new obstacles are
+    #repaired with all their edges. A consistent vertex whose rsh-value
+    #was recalculated may have got another parent with the same costs: it
+    #is queued again (see updateQueue) and its new successors are updated.
+    def computeShortestPathJump(self, stepLimit=None):
+        if not self.pruning:
+            return self.computeShortestPathLoop(stepLimit)
+        counters= self.metrics.counters
+        tracing= self.metrics.tracing
+        observer= self.observer
+        queue= self.priorityQueue
+        goal= self.goalNode
+        start= self.startNode
+        stops= set(self.robotNodes) if self.robotNodes is not None else {start}
+        self.planSteps=0  #counts loops of while-statement
+        while queue.top_key() < start.calculateKey(start, self.k, self.heuristic) or \
+              start.rsh != start.g:
+            if self.planSteps == stepLimit:
+                return False
+            k_old= queue.top_key()
+            u= queue.pop()
+            counters['heapPop']+= 1
+            if tracing:
+                self.metrics.event('pop', x=u.x, y=u.y, key=k_old)
+            if not u in self.obstacles:
+                self.updateVertexColor(u, "white")
+            k= u.calculateKey(start, self.k, self.heuristic)
+            if k_old < k:
+                queue.insert(u, k)
+                counters['heapPush']+= 1
+                self.updateVertexColor(u, "yellow")
+            elif u.g >= u.rsh:
+                if u.g > u.rsh:
+                    u.g= u.rsh
+                    self.pathDirty.add(u)
+                    observer.update_g(u.x, u.y)
+                gu= u.g
+                uCost= u.cost
+                for s, cost in self.prunedNeighbors(u):
+                    counters['vertexUpdates']+= 1
+                    value= cost * (s.cost + uCost) * 0.5 + gu
+                    if s is not goal and value < s.rsh:
+                        s.rsh= value
+                        observer.update_rsh(s.x, s.y)
+                        self.jump(s, s.x - u.x, s.y - u.y, stops)
+            else:
+                u.g= float('inf')
+                self.pathDirty.add(u)
+                observer.update_g(u.x, u.y)
+                for pred, cost in self.adjacency[u.x][u.y]:
+                    self.updateVertex(pred)
+                self.updateVertex(u)
+            self.planSteps+=1
+            counters['expansions']+= 1
+            observer.planStepDone()
+        return True
+
+    #aVertex got a new rsh-value by the move dx, dy from its parent. On a
+    #straight line without forced neighbors it is settled (g = rsh) at once
+    #and the next vertex of the line is updated. Jump points with forced
+    #neighbors, vertices of the robots in stops and vertices whose key is
+    #not below the key of the start are queued like in updateQueue.
+    def jump(self, aVertex, dx, dy, stops):
+        if dx != 0 and (dy != 0 or self.directNeighbors):
+            #Diagonal moves and horizontal moves with 4 neighbors have
+            #several natural neighbors
+            self.updateQueue(aVertex)
+            return
+        start= self.startNode
+        while True:
+            if aVertex.g <= aVertex.rsh or aVertex in stops or \
+               not aVertex.calculateKey(start, self.k, self.heuristic) < \
+                   start.calculateKey(start, self.k, self.heuristic):
+                self.updateQueue(aVertex)
+                return
+            successors= self.successorsInDirection(aVertex, dx, dy)
+            nextX= aVertex.x + dx
+            nextY= aVertex.y + dy
+            if any(s.x != nextX or s.y != nextY for s, cost in successors):
+                self.updateQueue(aVertex) #Jump point
+                return
+            aVertex.g= aVertex.rsh
+            self.pathDirty.add(aVertex)
+            self.observer.update_g(aVertex.x, aVertex.y)
+            if self.priorityQueue.contains(aVertex):
+                self.priorityQueue.remove(aVertex)
+                self.metrics.counters['heapRemove']+= 1
+                self.updateVertexColor(aVertex, "white")
+            self.metrics.counters['jumpSteps']+= 1
+            if not successors:
+                return
+            s, cost= successors[0]
+            value= cost * (s.cost + aVertex.cost) * 0.5 + aVertex.g
+            if s is self.goalNode or value >= s.rsh:
+                return
+            s.rsh= value
+            self.observer.update_rsh(s.x, s.y)
+            aVertex= s
+
+    #Return the (neighbor, cost) pairs an overconsistent vertex updates with
+    #pruning: the successors of all its parent directions, all neighbors
+    #for the goal and for a vertex without parent
+    def prunedNeighbors(self, aVertex):
+        directions= self.parentDirections(aVertex)
+        if not directions:
+            return [(s, cost) for s, cost in self.adjacency[aVertex.x][aVertex.y]
+                    if not s.isObstacle]
+        if len(directions) == 1:
+            return self.successorsInDirection(aVertex, *directions[0])
+        successors= {}
+        for dx, dy in directions:
+            for s, cost in self.successorsInDirection(aVertex, dx, dy):
+                successors[s]= cost
+        return list(successors.items())
+
+    #Return the moves (dx, dy) from the parents of aVertex to aVertex: the
+    #neighbors which give rsh(aVertex). Several parents often have the same
+    #costs, the sums are compared after rounding like the keys.
+    def parentDirections(self, aVertex):
+        if aVertex is self.goalNode:
+            return []
+        rounding= vertex.KEY_ROUNDING
+        rsh= aVertex.rsh + rounding - rounding
+        aCost= aVertex.cost
+        return [(aVertex.x - s.x, aVertex.y - s.y) for s, cost in self.adjacency[aVertex.x][aVertex.y]
+                if not s.isObstacle and cost * (aCost + s.cost) * 0.5 + s.g + rounding - rounding == rsh]
+
+    #Return the (neighbor, cost) pairs which a vertex reached by the move
+    #dx, dy has to update: the natural neighbors, which cannot be reached
+    #as cheaply from the parent without the vertex, and the forced neighbors
+    #beside obstacles. 8 neighbors: diagonal moves first, then straight
+    #moves. 4 neighbors: horizontal moves first, then vertical moves.
+    def successorsInDirection(self, aVertex, dx, dy):
+        grid= self.vertexGrid
+        width= self.width
+        height= self.height
+        x= aVertex.x
+        y= aVertex.y
+        #True if the vertex at x+mx, y+my exists and is an obstacle
+        blocked= lambda mx, my: 0 <= x + mx < width and 0 <= y + my < height and \
+                                grid[x + mx][y + my].isObstacle
+        if self.directNeighbors:
+            if dy == 0:
+                moves= [(dx, 0), (0, 1), (0, -1)]
+            else:
+                moves= [(0, dy)] + [(mx, 0) for mx in (1, -1) if blocked(mx, -dy)]
+        elif dx == 0 or dy == 0:
+            moves= [(dx, dy)] + [(dx + px, dy + py) for px, py in ((dy, dx), (-dy, -dx))
+                                 if blocked(px, py)]
+        else:
+            moves= [(dx, dy), (dx, 0), (0, dy)]
+            if blocked(-dx, 0):
+                moves.append((-dx, dy))
+            if blocked(0, -dy):
+                moves.append((dx, -dy))
+        successors= []
+        for mx, my in moves:
+            if 0 <= x + mx < width and 0 <= y + my < height:
+                s= grid[x + mx][y + my]
+                if not s.isObstacle:
+                    successors.append((s, 1.4 if mx and my else 1))
+        return successors
+
+    #The loop of ComputeOrImprovePath of Anytime D*: like the basic loop with
+    #the keys of anytimeKey. Every vertex is expanded at most once as
+    #overconsistent vertex per search (closed), vertices which become
+    #inconsistent again wait in incons for the next search (see updateQueue).
+    def computeShortestPathAnytime(self, stepLimit=None):
+        counters= self.metrics.counters
+        tracing= self.metrics.tracing
+        queue= self.priorityQueue
+        start= self.startNode
+        closed= self.closed
+        self.planSteps=0  #counts loops of while-statement
+        while queue.top_key() < self.anytimeKey(start) or start.rsh != start.g:
+            if self.planSteps == stepLimit:
+                return False
+            k_old= queue.top_key()
+            u= queue.pop()
+            counters['heapPop']+= 1
+            if tracing:
+                self.metrics.event('pop', x=u.x, y=u.y, key=k_old)
+            if not u in self.obstacles:
+                self.updateVertexColor(u, "white")
+            k= self.anytimeKey(u)
+            if k_old < k:
+                queue.insert(u, k)
+                counters['heapPush']+= 1
+                self.updateVertexColor(u, "yellow")
+            elif u.g > u.rsh:
+                u.g= u.rsh
+                closed.add(u)
+                self.pathDirty.add(u)
+                self.observer.update_g(u.x, u.y)
+                for pred, cost in self.adjacency[u.x][u.y]:
+                    self.updateVertex(pred)
+            else:
+                u.g= float('inf')
+                self.pathDirty.add(u)
+                self.observer.update_g(u.x, u.y)
+                for pred, cost in self.adjacency[u.x][u.y]:
+                    self.updateVertex(pred)
+                self.updateVertex(u)
+            self.planSteps+=1
+            counters['expansions']+= 1
+            self.observer.planStepDone()
+        return True
+
+    #Key of a vertex in Anytime D*: the heuristic of overconsistent vertices
+    #is inflated by epsilon, underconsistent vertices keep the key of D* Lite
+    def anytimeKey(self, aVertex):
+        h= aVertex.h(self.startNode, self.heuristic)
+        if aVertex.g > aVertex.rsh:
+            rsh= aVertex.rsh
+            aVertex.key= (rsh + self.epsilon * h + self.k + vertex.KEY_ROUNDING - vertex.KEY_ROUNDING,
+                          rsh)
+        else:
+            g= aVertex.g
+            aVertex.key= (g + h + self.k + vertex.KEY_ROUNDING - vertex.KEY_ROUNDING, g)
+        return aVertex.key
+
+    #Return the key of a vertex for the priority queue
+    def queueKey(self, aVertex):
+        if self.anytime:
+            return self.anytimeKey(aVertex)
+        return aVertex.calculateKey(self.startNode, self.k, self.heuristic)
+
+    #Start a new search of Anytime D* with the actual epsilon: the vertices
+    #of incons join the queue, all keys are calculated again, no vertex
+    #is closed
+    def startAnytimeSearch(self):
+        queue= self.priorityQueue
+        for aVertex in self.incons:
+            if aVertex.g != aVertex.rsh and not queue.contains(aVertex):
+                queue.insert(aVertex, self.anytimeKey(aVertex))
+                self.metrics.count('heapPush')
+        self.incons= set()
+        self.closed= set()
+        self.rekeyQueue()
+
+    #Anytime D*: show the path of the last search and inform the observer
+    def publishPlan(self):
+        self.planReady= self.startNode.g != float('inf')
+        with self.metrics.phase('extractPath'):
+            self.showAndRemberPath()
+        self.metrics.event('anytimePlan', epsilon=self.epsilon, cost=self.startNode.g,
+                           planReady=self.planReady)
+        if self.planReady:
+            self.observer.pathPublished(self.epsilon)
+
+    #Anytime D*: decrease epsilon toward 1 and search again as long as the
+    #time budget after startTime allows. planSteps counts the loops of all
+    #searches.
+    def improvePlan(self, startTime):
+        steps= self.planSteps
+        while self.planReady and self.epsilon > 1 and \
+              (self.timeBudget is None or time.time() - startTime < self.timeBudget):
+            self.epsilon= max(1.0, self.epsilon - self.epsilonStep)
+            self.startAnytimeSearch()
+            self.computeShortestPath()
+            steps+= self.planSteps
+            self.publishPlan()
+        self.planSteps= steps
+
+    #Plan a path from start to goal. Return True if a plan exists.
+    #A new plan on an engine that already searched starts from scratch:
+    #start, goal or robots may have changed.
+    def plan(self):
+        self.planReady = False
+        startTime= time.time()
+        if self.goalNode is not None:
+            self.resetSearch()
+        #Start the planning algorithm
+        self.startNode= self.vertexGrid[self.startCoordinates[0]][self.startCoordinates[1]]
+        self.lastNode= self.startNode
+        if self.robotNodes is not None:
+            self.lastRobotNodes= list(self.robotNodes)
+        self.epsilon= self.initialEpsilon if self.anytime else 1.0
+        self.closed= set()
+        self.incons= set()
+        with self.metrics.phase('initializePlanning'):
+            self.initializePlanning()
+        self.computeShortestPath()
+
+        #A path exists if g(startNode) != float('inf')
+        #Mark the path in light blue
+        self.actualPath=[]
+        if self.anytime:
+            self.publishPlan()
+            self.improvePlan(startTime)
+            self.planTime= time.time() - startTime
+        else:
+            self.planTime= time.time() - startTime
+            self.planReady= self.startNode.g != float('inf')
+            with self.metrics.phase('extractPath'):
+                self.showAndRemberPath()
+        self.metrics.event('plan', seconds=self.planTime, steps=self.planSteps,
+                           planReady=self.planReady, queue=self.priorityQueue.stats())
+        return self.planReady
+
+    #Plan the paths of all robots (see setRobots) with one search.
+    #Return the paths like robotPaths.
+    def planRobots(self):
+        self.plan()
+        return self.robotPaths()
+
+    #Return the path (list of vertices to goal) of every robot,
+    #[] for a robot without path. The paths are not shown on the observer.
+    def robotPaths(self):
+        return [self.pathFrom(node) for node in self.robotNodes]
+
+    #### Snapshots ##################################################################
+
+    #Return the planning state as bytes: design of the grid, g- and
+    #rsh-values, queue with keys, k, start/last vertices, robots and path.
+    #restore continues the incremental replanning from this state.
+    def snapshot(self):
+        if self.goalNode is None:
+            raise Exception('Snapshot: no planning state (plan first)')
+        height= self.height
+        cellId= lambda node: node.x * height + node.y
+        cellIds= lambda nodes: [cellId(node) for node in nodes] if nodes is not None else None
+        hasCosts= any(node.cost != 1 for node in self.vertices())
+        entries= self.priorityQueue.entries()
+        #Inconsistent vertices of Anytime D* outside of the queue are saved with it
+        entries.extend((aVertex.key, aVertex) for aVertex in self.incons
+                       if aVertex.g != aVertex.rsh and not self.priorityQueue.contains(aVertex))
+        state= {'byteorder': sys.byteorder, 'width': self.width, 'height': height,
+                'directNeighbors': self.directNeighbors, 'hIsZero': self.hIsZero,
+                'heuristic': self.heuristicName, 'algorithm': self.algorithm,
+                'startCoordinates': self.startCoordinates, 'goalCoordinates': self.goalCoordinates,
+                'start': cellId(self.startNode), 'last': cellId(self.lastNode), 'k': self.k,
+                'planReady': self.planReady, 'robots': cellIds(self.robotNodes),
+                'lastRobots': cellIds(self.lastRobotNodes), 'hasCosts': hasCosts,
+                'queueCount': len(entries), 'pathLength': len(self.actualPath),
+                'anytime': self.anytime}
+        header= json.dumps(state).encode()
+        keys= array.array('d')
+        for key, node in entries:
+            keys.extend(key)
+        parts= [SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(header)), header,
+                self.cellArray('d', lambda node: node.g, float('inf')).tobytes(),
+                self.cellArray('d', lambda node: node.rsh, float('inf')).tobytes(),
+                self.cellArray('B', lambda node: 1 if node.isObstacle else 0, 0).tobytes()]
+        if hasCosts:
+            parts.append(self.cellArray('d', lambda node: node.cost, 1).tobytes())
+        parts.append(array.array('i', [cellId(node) for key, node in entries]).tobytes())
+        parts.append(keys.tobytes())
+        parts.append(array.array('i', cellIds(self.actualPath)).tobytes())
+        return b''.join(parts)
+
+    #Return an array of value(vertex) for all cells in the order of the cell
+    #ids. Cells without vertex (grid type 'Sparse') get the default.
+    def cellArray(self, typeCode, value, default):
+        if self.gridType != 'Sparse':
+            return array.array(typeCode, [value(node) for column in self.vertexGrid
+                                          for node in column])
+        values= array.array(typeCode, [default]) * (self.width * self.height)
+        height= self.height
+        for node in self.vertices():
+            values[node.x * height + node.y]= value(node)
+        return values
+
+    #Restore a state of snapshot. The grid must have the size of the snapshot,
+    #its design is replaced. The observer is informed about all vertices
+    #with g- or rsh-values and the path.
+    def restore(self, data):
+        magic, version, headerSize= SNAPSHOT_HEADER.unpack_from(data)
+        if magic != SNAPSHOT_MAGIC:
+            raise Exception('Not a planner snapshot')
+        if version != SNAPSHOT_VERSION:
+            raise Exception('Unsupported snapshot version: ' + str(version))
+        position= SNAPSHOT_HEADER.size
+        state= json.loads(data[position:position + headerSize].decode())
+        position+= headerSize
+        if state['byteorder'] != sys.byteorder:
+            raise Exception('Snapshot of a computer with another byte order')
+        if state['width'] != self.width or state['height'] != self.height:
+            raise Exception('Snapshot size ' + str(state['width']) + 'x' + str(state['height']) +
+                            ' does not match the grid')
+        #Read the arrays in the order of snapshot
+        def read(typeCode, count):
+            nonlocal position
+            values= array.array(typeCode)
+            end= position + count * values.itemsize
+            values.frombytes(data[position:end])
+            position= end
+            return values
+        size= self.width * self.height
+        gValues= read('d', size)
+        rshValues= read('d', size)
+        obstacleValues= read('B', size)
+        costValues= read('d', size) if state['hasCosts'] else None
+        queueIds= read('i', state['queueCount'])
+        keys= read('d', 2 * state['queueCount'])
+        pathIds= read('i', state['pathLength'])
+        #Design of the grid and planning settings
+        self.directNeighbors= state['directNeighbors']
+        self.hIsZero= state['hIsZero']
+        self.setHeuristic(state['heuristic'])
+        self.algorithm= state['algorithm']
+        height= self.height
+        grid= self.vertexGrid
+        node= lambda cellId: grid[cellId // height][cellId % height]
+        if self.gridType == 'Sparse':
+            #Only cells with other values than a new vertex get a vertex
+            for aVertex in self.vertices():
+                aVertex.g= float('inf')
+                aVertex.rsh= float('inf')
+                aVertex.isObstacle= False
+                aVertex.cost= 1
+            inf= float('inf')
+            cellIds= [i for i in range(size) if gValues[i] != inf or rshValues[i] != inf or
+                      obstacleValues[i] or (costValues is not None and costValues[i] != 1)]
+            nodes= [node(i) for i in cellIds]
+            gValues= [gValues[i] for i in cellIds]
+            rshValues= [rshValues[i] for i in cellIds]
+            obstacleValues= [obstacleValues[i] for i in cellIds]
+            if costValues is not None:
+                costValues= [costValues[i] for i in cellIds]
+        else:
+            nodes= [aVertex for column in grid for aVertex in column]
+        self.obstacles= set()
+        for aVertex, g, rsh, isObstacle in zip(nodes, gValues, rshValues, obstacleValues):
+            aVertex.g= g
+            aVertex.rsh= rsh
+            aVertex.isObstacle= isObstacle == 1
+            if isObstacle:
+                self.obstacles.add(aVertex)
+        for aVertex, cost in zip(nodes, costValues if costValues is not None else ()):
+            aVertex.cost= cost
+        if costValues is None:
+            for aVertex in nodes:
+                aVertex.cost= 1
+        if self.goalCoordinates[0] != float('inf'):
+            grid[self.goalCoordinates[0]][self.goalCoordinates[1]].isGoal= False
+        self.startCoordinates= state['startCoordinates']
+        self.goalCoordinates= state['goalCoordinates']
+        self.goalNode= grid[self.goalCoordinates[0]][self.goalCoordinates[1]]
+        self.goalNode.isGoal= True
+        #Planning state
+        self.startNode= node(state['start'])
+        self.lastNode= node(state['last'])
+        self.k= state['k']
+        self.robotNodes= [node(i) for i in state['robots']] if state['robots'] is not None else None
+        self.lastRobotNodes= [node(i) for i in state['lastRobots']] \
+                             if state['lastRobots'] is not None else None
+        if self.adjacency is None:
+            self.buildAdjacency()
+        #The keys in the queue were calculated with the heuristic of the
+        #last robot positions
+        robotNodes= self.robotNodes
+        self.robotNodes= self.lastRobotNodes
+        self.createHeuristic()
+        self.robotNodes= robotNodes
+        self.priorityQueue= type(self.priorityQueue)()
+        for i, cellId in enumerate(queueIds):
+            aVertex= node(cellId)
+            aVertex.key= (keys[2 * i], keys[2 * i + 1])
+            self.priorityQueue.insert(aVertex, aVertex.key)
+        if self.heuristic.dependsOnMap:
+            #A recreated distance field heuristic differs from the saved one
+            self.rekeyQueue()
+        self.closed= set()
+        self.incons= set()
+        if state.get('anytime') or self.anytime:
+            #Inflated keys of the snapshot or of the next search
+            self.rekeyQueue()
+        self.planReady= state['planReady']
+        self.actualPath= [node(cellId) for cellId in pathIds]
+        self.pathDirty= set()
+        self.recolored= set()
+        self.planSteps= 0
+        for aVertex in nodes:
+            if aVertex.g != float('inf') or aVertex.rsh != float('inf'):
+                self.observer.update_g(aVertex.x, aVertex.y)
+                self.observer.update_rsh(aVertex.x, aVertex.y)
+        for aVertex in self.actualPath[1:-1]:
+            self.observer.updateColor(aVertex, 'light blue')
+        self.pruning= self.canPrune()
+
+    #Write a snapshot to a file
+    def saveSnapshot(self, fileName):
+        with open(fileName, 'wb') as f:
+            f.write(self.snapshot())
+
+    #Restore the state of a snapshot file
+    def loadSnapshot(self, fileName):
+        with open(fileName, 'rb') as f:
+            self.restore(f.read())
+
+    # Utilities for planning #########################################################
+
+    #Build the neighbor table for the actual connectivity. For every vertex
+    #the table holds a tuple of (neighbor, cost) pairs in the order of
+    #the neighbors function. cost is the distance without terrain costs.
+    #The table has to be rebuilt if the grid or the connectivity changes.
+    #With the grid type 'Sparse' the table of a vertex is created on the
+    #first access.
+    def buildAdjacency(self):
+        if self.directNeighbors:
+            moves= ((-1, 0, 1), (1, 0, 1), (0, -1, 1), (0, 1, 1))
+        else:
+            moves= ((-1, -1, 1.4), (-1, 0, 1), (-1, 1, 1.4), (0, -1, 1),
+                    (0, 1, 1), (1, -1, 1.4), (1, 0, 1), (1, 1, 1.4))
+        grid= self.vertexGrid
+        if self.gridType == 'Sparse':
+            self.adjacency= sparseGrid.SparseAdjacency(grid, moves)
+            return
+        width= self.width
+        height= self.height
+        self.adjacency= [[tuple((grid[x + dx][y + dy], cost) for dx, dy, cost in moves
+                                if 0 <= x + dx < width and 0 <= y + dy < height)
+                          for y in range(height)] for x in range(width)]
+
+    #Return the (neighbor, cost) pairs of a vertex without considering obstacles
+    def neighborTable(self, aVertex):
+        if self.adjacency is None:
+            self.buildAdjacency()
+        return self.adjacency[aVertex.x][aVertex.y]
+
+    #Calculate the cost of moving to a neighbor vertex
+    def neighborCost(self, fromVertex, toVertex):
+        if toVertex.isObstacle or fromVertex.isObstacle:
+            return float('inf') #Do not move in or from an obstacle
+        distance= (fromVertex.x - toVertex.x, fromVertex.y - toVertex.y)
+        if distance in STRAIGHT_MOVES:
+            cost= 1  #straight move
+        elif distance in DIAGONAL_MOVES:
+            cost= 1.4 #diagonal move
+        else:
+            raise Exception("NeighborCost: Vertex is not a neighbor")
+        return cost * (fromVertex.cost + toVertex.cost) * 0.5
+
+    #Calculate the cost of an edge with the given distance from the
+    #states (isObstacle, cost) of both vertices
+    def edgeCost(self, distance, state1, state2):
+        if state1[0] or state2[0]:
+            return float('inf')
+        return distance * (state1[1] + state2[1]) * 0.5
+
+    #Calculate neighbors of a vertex depending on the
+    #maximum count (4 or 8). Return neighbor vertices.
+    def neighbors(self, aVertex):
+        return [n for n, cost in self.neighborTable(aVertex)]
+
+    #Return the path from aVertex to goal along the cheapest successors,
+    #[] if there is no path
+    def pathFrom(self, aVertex):
+        path= []
+        node= aVertex
+        while node != self.goalNode:
+            if node is None or node.g == float('inf'):
+                return []
+            if len(path) > self.width * self.height:
+                raise Exception('Path from ' + str((aVertex.x, aVertex.y)) + ' runs in a cycle')
+            path.append(node)
+            node= self.calcCheapestNeighbor(node)
+        path.append(node)
+        return path
+
+    #Calculate the successor of a vertex on the cheapest path: the neighbor s
+    #with the smallest cost(aVertex, s) + g(s). Return None if no neighbor
+    #can be reached. Used after planning for finding the cheapest path.
+    def calcCheapestNeighbor(self, aVertex):
+        cheapest= None
+        best= float('inf')
+        if not aVertex.isObstacle:
+            aCost= aVertex.cost
+            for s, cost in self.neighborTable(aVertex):
+                if not s.isObstacle:
+                    value= cost * (aCost + s.cost) * 0.5 + s.g
+                    if value < best:
+                        best= value
+                        cheapest= s
+        return cheapest
+
+    #Function implements the UpdateVertex procedure of the D*Lite algorithm
+    #Only calls for the observer are added
+    def updateVertex(self, aVertex):
+        metrics= self.metrics
+        metrics.counters['vertexUpdates']+= 1
+        if aVertex != self.goalNode:
+            #Calculate new rsh(aVertex): Do not move in or from an obstacle
+            aVertex.rsh= self.calcRsh(aVertex)
+            #Update rsh-value on observer
+            self.observer.update_rsh(aVertex.x, aVertex.y)
+        self.updateQueue(aVertex)
+
+    #Calculate the rsh-value of a vertex from its neighbors
+    def calcRsh(self, aVertex):
+        rsh= float('inf')
+        if not aVertex.isObstacle:
+            aCost= aVertex.cost
+            for s, cost in self.adjacency[aVertex.x][aVertex.y]:
+                if not s.isObstacle:
+                    value= cost * (aCost + s.cost) * 0.5 + s.g
+                    if value < rsh:
+                        rsh= value
+        return rsh
+
+    #Insert, update or remove a vertex in the priority queue
+    #depending on its consistency
+    def updateQueue(self, aVertex):
+        metrics= self.metrics
+        inQueue= self.priorityQueue.contains(aVertex)
+        if self.anytime and aVertex in self.closed and aVertex.g != aVertex.rsh:
+            #Anytime D* expands a vertex once per search
+            if inQueue:
+                self.priorityQueue.remove(aVertex)
+                metrics.counters['heapRemove']+= 1
+            self.incons.add(aVertex)
+            return
+        #With pruning a consistent vertex may have got a new parent, its
+        #successors are updated when it is expanded again
+        if aVertex.g != aVertex.rsh or (self.pruning and aVertex.g != float('inf')):
+            key= self.queueKey(aVertex)
+            if inQueue:
+                self.priorityQueue.update(aVertex, key)
+                metrics.counters['heapUpdate']+= 1
+            else:
+                self.priorityQueue.insert(aVertex, key)
+                metrics.counters['heapPush']+= 1
+            if metrics.tracing:
+                metrics.event('queued', x=aVertex.x, y=aVertex.y, key=key)
+            self.updateVertexColor(aVertex, "yellow")
+        elif inQueue:
+            self.priorityQueue.remove(aVertex)
+            metrics.counters['heapRemove']+= 1
+            if metrics.tracing:
+                metrics.event('removed', x=aVertex.x, y=aVertex.y)
+
+    # Show the planned path on the observer and remember the path
+    # for execution. The successor of a vertex can only change if the
+    # vertex or one of its neighbors got a new g-value or terrain since
+    # the last extraction (pathDirty). Parts of the old path without such
+    # vertices are taken over, only the rest is extracted again. Only
+    # vertices which joined or left the path or were colored by the
+    # planning are repainted.
+    def showAndRemberPath(self):
+        oldPath= self.actualPath
+        position= {node: i for i, node in enumerate(oldPath)}
+        dirty= self.pathDirty
+        self.pathDirty= set()
+        if len(dirty) > len(oldPath):
+            #Many changes: only test the vertices of the old path
+            affected= set(node for node in oldPath if node in dirty or
+                          any(n in dirty for n, cost in self.neighborTable(node)))
+        else:
+            affected= set(dirty)
+            for node in dirty:
+                affected.update(n for n, cost in self.neighborTable(node))
+        node= self.lastNode #from here to goal
+        path= []
+        last= len(oldPath) - 1
+        while (node != self.goalNode) and self.planReady:
+            i= position.get(node)
+            if i is not None and i < last and node not in affected:
+                #Unchanged part of the old path up to the next affected vertex
+                j= i + 1
+                while j < last and oldPath[j] not in affected:
+                    j+= 1
+                path.extend(oldPath[i:j])
+                node= oldPath[j]
+            else:
+                path.append(node)
+                node= self.calcCheapestNeighbor(node)
+                self.planReady= node is not None and node.g != float('inf')
+            if len(path) > self.width * self.height:
+                #The g-values after ComputeShortestPath decrease along the
+                #cheapest successors: a cycle is an error of the planning
+                raise Exception('Path from ' + str((self.lastNode.x, self.lastNode.y)) +
+                                ' runs in a cycle')
+        if self.planReady:
+            path.append(self.goalNode)
+        #Repaint the vertices behind the start which left or joined the path
+        start= position.get(self.lastNode, -1)
+        oldRest= set(oldPath[start + 1:])
+        newRest= set(path[1:])
+        if not self.planReady and node is not None:
+            newRest.add(node) #Shown up to the vertex without path
+        for node in oldRest - newRest:
+            if node != self.goalNode and not node.isObstacle:
+                self.observer.updateColor(node, 'white')
+        for node in (newRest - oldRest) | (newRest & self.recolored):
+            if node != self.goalNode and not node.isObstacle:
+                self.observer.updateColor(node, 'light blue')
+        self.recolored= set()
+        self.actualPath= path
+
+    def updateVertexColor(self, aVertex, aColor):
+        if not aVertex== self.startNode and not aVertex == self.goalNode:
+            self.observer.updateColor(aVertex,aColor)
+            self.recolored.add(aVertex)
+
+    # New obstacle on planned path during plan execution has been found.
+    # Replan the path to goal
+    # Return if a plan exists.
+    def replanning(self, aVertex):
+        return self.applyChanges(blocked=(aVertex,))
+
+    # Several vertices changed during plan execution: blocked vertices
+    # became obstacles, freed vertices are no obstacles anymore and
+    # costs is a sequence of (vertex, new terrain cost factor).
+    # Every edge of a changed vertex is updated with the edge-change
+    # rules of D* Lite, then each affected vertex is queued once and the
+    # path to goal is replanned with a single ComputeShortestPath.
+    # Return if a plan exists.
+    def applyChanges(self, blocked=(), freed=(), costs=()):
+        startTime= time.time()
+        self.metrics.count('replans')
+        if self.metrics.tracing:
+            self.metrics.event('replanning', blocked=[(v.x, v.y) for v in blocked],
+                               freed=[(v.x, v.y) for v in freed],
+                               costs=[(v.x, v.y, c) for v, c in costs])
+        with self.metrics.phase('replanning'):
+            self.moveStart()
+            #Remember the old states (isObstacle, cost) for the old edge costs.
+            #Blocked and freed vertices may already carry the new flag.
+            oldStates= {}
+            for aVertex in blocked:
+                oldStates[aVertex]= (False, aVertex.cost)
+            for aVertex in freed:
+                oldStates[aVertex]= (True, aVertex.cost)
+            for aVertex, cost in costs:
+                oldStates.setdefault(aVertex, (aVertex.isObstacle, aVertex.cost))
+            for aVertex in blocked:
+                aVertex.isObstacle= True
+                self.obstacles.add(aVertex)
+            for aVertex in freed:
+                aVertex.isObstacle= False
+                self.obstacles.discard(aVertex)
+            for aVertex, cost in costs:
+                self.checkCost(cost)
+                aVertex.cost= cost
+            self.pathDirty.update(oldStates)
+            if self.pruning and any(cost != 1 for aVertex, cost in costs):
+                #Jump point pruning needs uniform costs: search again without it
+                self.restartPlanning()
+            else:
+                #Lower costs can make a heuristic from distance fields overestimate
+                if self.heuristic.dependsOnMap and \
+                   (freed or any(oldStates[aVertex][1] > aVertex.cost for aVertex, cost in costs)):
+                    self.createHeuristic()
+                    self.rekeyQueue()
+                self.updateChangedEdges(oldStates)
+            if self.anytime:
+                self.epsilon= self.initialEpsilon
+                self.startAnytimeSearch()
+                self.computeShortestPath()
+                self.publishPlan()
+                self.improvePlan(startTime)
+            else:
+                self.computeShortestPath()
+        self.planReady= self.startNode.g != float('inf')
+        return self.planReady
+
+    # The vertices of oldStates (vertex -> old (isObstacle, cost)) have new
+    # states. Each changed edge is handled once in both directions with the
+    # edge-change rules, then each affected vertex is queued once.
+    def updateChangedEdges(self, oldStates):
+        affected= {}
+        handled= set()
+        for u, uOld in oldStates.items():
+            affected[u]= True
+            handled.add(u)
+            uNew= (u.isObstacle, u.cost)
+            for v, distance in self.neighborTable(u):
+                if v in handled:
+                    continue #Edge already handled from v
+                vNew= (v.isObstacle, v.cost)
+                vOld= oldStates.get(v, vNew)
+                oldCost= self.edgeCost(distance, uOld, vOld)
+                newCost= self.edgeCost(distance, uNew, vNew)
+                if oldCost != newCost:
+                    self.updateEdge(u, v, oldCost, newCost)
+                    self.updateEdge(v, u, oldCost, newCost)
+                affected[v]= True
+        self.metrics.count('vertexUpdates', len(affected))
+        for aVertex in affected:
+            self.updateQueue(aVertex)
+
+    # Discard all g- and rsh-values and the queue and initialize the
+    # planning again for the actual start vertex
+    def restartPlanning(self):
+        self.metrics.event('restartPlanning')
+        self.resetSearch()
+        self.initializePlanning()
+
+    # Forget the search: g and rsh of all vertices are inf again (rsh of the
+    # goal 0) and the priority queue is empty
+    def resetSearch(self):
+        for node in self.vertices():
+            if node.g != float('inf') or node.rsh != float('inf'):
+                node.g= float('inf')
+                node.rsh= float('inf')
+                self.pathDirty.add(node)
+                self.observer.update_g(node.x, node.y)
+                self.observer.update_rsh(node.x, node.y)
+        self.vertexGrid[self.goalCoordinates[0]][self.goalCoordinates[1]].rsh= 0
+        self.priorityQueue= type(self.priorityQueue)()
+
+    # The robot moved from lastNode to startNode. The keys in the queue stay
+    # lower bounds if k grows by the heuristic of this move. Several robots
+    # move from lastRobotNodes to robotNodes: k grows by the largest move, if
+    # robots were added or removed all keys are calculated again.
+    def moveStart(self):
+        if self.robotNodes is None:
+            self.k= self.k + self.lastNode.h(self.startNode, self.heuristic)
+        else:
+            self.startNode= self.robotNodes[0]
+            self.heuristic= heuristics.MultiStartHeuristic(self.baseHeuristic, self.robotNodes)
+            if self.lastRobotNodes is not None and len(self.lastRobotNodes) == len(self.robotNodes):
+                h= self.baseHeuristic.h
+                self.k= self.k + max(h(last, node) for last, node in
+                                     zip(self.lastRobotNodes, self.robotNodes))
+            else:
+                self.rekeyQueue()
+            self.lastRobotNodes= list(self.robotNodes)
+        self.lastNode= self.startNode
+
+    # The heuristic has changed: calculate the keys of all vertices in the
+    # queue again for the actual start vertex. Then k is 0 again.
+    def rekeyQueue(self):
+        self.k= 0.0
+        for aVertex in list(self.priorityQueue):
+            self.priorityQueue.update(aVertex, self.queueKey(aVertex))
+        self.metrics.count('heapUpdate', self.priorityQueue.count())
+
+    # Edge-change rule of D* Lite for the edge from u to its successor v:
+    # the cost changed from oldCost to newCost. Update rsh(u).
+    def updateEdge(self, u, v, oldCost, newCost):
+        if u == self.goalNode:
+            return
+        if oldCost > newCost:
+            value= newCost + v.g
+            if value < u.rsh:
+                u.rsh= value
+                self.observer.update_rsh(u.x, u.y)
+        elif u.rsh == oldCost + v.g or self.pruning:
+            #The cheapest edge got more expensive. With pruning rsh(u) may
+            #still come from an older, higher g(v): always recalculate it.
+            u.rsh= self.calcRsh(u)
+            self.observer.update_rsh(u.x, u.y)
+
+if __name__ == "__main__":
+    #Plan headless on a small grid with a wall
+    engine= DStarLiteEngine(gridWidth=8, gridHeight=6, hIsZero=False, directNeighbors=True)
+    for y in range(0, 5):
+        engine.setObstacle(4, y)
+    engine.setStartCoordinates(0, 0)
+    engine.setGoalCoordinates(7, 0)
+    if engine.plan():
+        print('Path:', [(node.x, node.y) for node in engine.actualPath])
+    else:
+        print('No path exists')
+    #Three robots with the same goal share one new search (plan starts from scratch)
+    engine.setRobots([(0, 0), (2, 5), (6, 3)])
+    for path in engine.planRobots():
+        print('Robot path:', [(node.x, node.y) for node in path])
+    print('Planning steps for all robots:', engine.planSteps)
+    #Continue the replanning in a new engine from a snapshot
+    restored= DStarLiteEngine(gridWidth=8, gridHeight=6, hIsZero=False, directNeighbors=True)
+    restored.restore(engine.snapshot())
+    restored.replanning(restored.vertexGrid[1][0])
+    print('Restored after new obstacle:', restored.planSteps, 'steps, path cost:', restored.startNode.g)
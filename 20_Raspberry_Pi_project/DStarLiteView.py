@@ -5,6 +5,17 @@
 # for the vertexGrid of the D*Lite algorithm. It implements
 # the interactive design of the terrain with start-, goalnode
 # and obstacles and the pathplanning and path execution. 
+# The view is the observer of the planner (see
+# DStarLiteEngine.PlanObserver).
+# Free vertices are colored by their terrain cost.
+# Maps can be loaded from map files or occupancy images and
+# saved as map files (see mapFile.py, needs NumPy).
+# The heuristic of the planner is chosen in the Planning tab
+# (see heuristics.py).
+# Plans of repeated missions are taken from a plan cache
+# (see planCache.py).
+# In the planning mode 'Anytime' every path published by
+# Anytime D* is shown at once.
 #
 # File: DStarLiteView.py
 # Author: Detlef Heinze 
@@ -13,9 +24,13 @@
 
 from tkinter import *
 from tkinter import messagebox
+from tkinter import filedialog
 from tkinter import ttk
 from DStarLitePlanner import *
+from heuristics import heuristicTypes
+from planCache import PlanCache
 import enum
+import time
 
 # Possible states of the application
 class AppState(enum.Enum): 
@@ -25,6 +40,13 @@ class AppState(enum.Enum):
     inExecution = 3
     afterExecution= 4
 
+# Background colors of free vertices: (maximum terrain cost, color)
+terrainColors= ((1, 'white'), (1.5, 'khaki'), (2, 'tan'), (3, 'sandy brown'),
+                (float('inf'), 'peru'))
+
+# Maximum width and height of a loaded map which can be shown
+maxViewSize= 30
+
 class DStarLiteView(object):
 
     #Initialize a new DStarLiteView
@@ -34,6 +56,7 @@ class DStarLiteView(object):
         self.master.resizable(0, 0)
         master.title("Interactive D* Lite 1.0")
         self.appState= AppState.inDesign
+        self.planCache= PlanCache() #Plans of repeated missions, shared by all planners
 
         #Default planning grid size
         self.gridHeight= 4
@@ -72,14 +95,27 @@ class DStarLiteView(object):
         self.rad1 = Radiobutton(self.designTab,text='Start', value=1, variable=self.clickModeVal)
         self.rad2 = Radiobutton(self.designTab,text='Goal', value=2, variable=self.clickModeVal)
         self.rad3 = Radiobutton(self.designTab,text='Obstacle', value=3, variable=self.clickModeVal)
+        self.rad4 = Radiobutton(self.designTab,text='Terrain', value=4, variable=self.clickModeVal)
         self.rad1.grid(column=1, row=1)
         self.rad2.grid(column=2, row=1)
         self.rad3.grid(column=3, row=1)
+        self.rad4.grid(column=4, row=1, sticky= W)
+        self.terrainCostVal= StringVar()
+        self.terrainCostVal.set('2')
+        self.spinTerrainCost= Spinbox(self.designTab, values=('1', '1.5', '2', '3', '5'), width=5,
+                                      state='readonly', textvariable=self.terrainCostVal)
+        self.spinTerrainCost.grid(column=5, row=1, sticky= W)
+
+        #tab control: designTab, row=2
+        self.btnLoadMap= Button(self.designTab, text="Load map", command=self.btnLoadMap_clicked)
+        self.btnLoadMap.grid(column=0, row=2, pady=5, sticky=W)
+        self.btnSaveMap= Button(self.designTab, text="Save map", command=self.btnSaveMap_clicked)
+        self.btnSaveMap.grid(column=1, row=2, pady=5, sticky=W)
         
         #tab control: planningTab
         self.lblMode= Label(self.planTab, text="Planning mode:")
         self.lblMode.grid(column=0, row=0, sticky= W)
-        self.cbPlanningMode= ttk.Combobox(self.planTab, state="readonly", values=('Fast','Slow step', 'Manual step'),
+        self.cbPlanningMode= ttk.Combobox(self.planTab, state="readonly", values=('Fast','Slow step', 'Manual step', 'Anytime'),
                                           width=12)
         self.cbPlanningMode.current(0)
         self.cbPlanningMode.grid(column=1, row=0, pady= 5, padx=0, sticky= W)
@@ -100,6 +136,12 @@ class DStarLiteView(object):
         self.planHint.set('-')
         self.lblPlanHintText= Label(self.planTab, text="", textvariable= self.planHint)
         self.lblPlanHintText.grid(column=1, row=1, pady= 5, columnspan=2, sticky= W)
+        self.lblHeuristic= Label(self.planTab, text="Heuristic:")
+        self.lblHeuristic.grid(column=3, row=1, padx=10, sticky= E)
+        self.cbHeuristic= ttk.Combobox(self.planTab, state="readonly",
+                                       values=('Default',) + tuple(heuristicTypes), width=15)
+        self.cbHeuristic.current(0)
+        self.cbHeuristic.grid(column=4, row=1, pady= 5, padx=20, sticky= W)
 
         #tab control: execTab
         self.lblExecMode= Label(self.execTab, text="Execution mode:")
@@ -137,19 +179,65 @@ class DStarLiteView(object):
         self.createGrid()
         self.h0Check.config(state="normal")
         self.neighbors.config(state="normal")
+        self.cbHeuristic.config(state="readonly")
         self.appState= AppState.inDesign
     
+    # Button "Load map" has been clicked. Recreate the grid from a
+    # map file or an occupancy image (PGM, PNG)
+    def btnLoadMap_clicked(self):
+        fileName= filedialog.askopenfilename(title='Load map',
+                    filetypes=(('Map files', '*.dslm'), ('Occupancy images', '*.pgm *.png'),
+                               ('All files', '*')))
+        if not fileName:
+            return
+        try:
+            import mapFile
+            if fileName.lower().endswith(('.pgm', '.png')):
+                gridMap= mapFile.importImage(fileName)
+            else:
+                gridMap= mapFile.loadMap(fileName)
+        except Exception as e:
+            self.show('Map not loaded: ' + str(e))
+            return
+        if gridMap.width > maxViewSize or gridMap.height > maxViewSize:
+            self.show('The map is too large for the view (max. ' + str(maxViewSize) + 'x' +
+                      str(maxViewSize) + '). Use ArrayDStarLite for headless planning.')
+            return
+        self.gridWidthVal.set(gridMap.width)
+        self.gridHeightVal.set(gridMap.height)
+        self.btnRecreate_clicked()
+        self.planner.applyMap(gridMap)
+        self.drawDesign()
+
+    # Button "Save map" has been clicked. Save the design as map file.
+    def btnSaveMap_clicked(self):
+        fileName= filedialog.asksaveasfilename(title='Save map', defaultextension='.dslm',
+                    filetypes=(('Map files', '*.dslm'),))
+        if not fileName:
+            return
+        try:
+            import mapFile
+            mapFile.saveMap(mapFile.mapFromEngine(self.planner), fileName)
+        except Exception as e:
+            self.show('Map not saved: ' + str(e))
+
     #Button "Start Planning" has been clicked. Execute planning
     def btnPlan_clicked(self):
         if self.appState != AppState.inDesign:
             messagebox.showinfo('Hint', 'Plan already created')
             return
+        if self.cbHeuristic.get() == 'Manhattan' and not self.directNeigbors.get() and \
+           not self.h0_check.get():
+            messagebox.showinfo('Hint', 'Heuristic Manhattan needs direct neighbors')
+            return
         self.tab_control.tab(0, state="disabled")
         self.tab_control.tab(2, state="disabled")
         #Check business rules
         if self.planner.areStartAndGoalSet():
             self.planner.hIsZero= self.h0_check.get()
             self.planner.directNeighbors= self.directNeigbors.get()
+            heuristic= self.cbHeuristic.get()
+            self.planner.setHeuristic(None if heuristic == 'Default' else heuristic)
             self.planHint.set('Planning in progress.......')
             self.appState= AppState.inPlanning
             self.master.update()
@@ -158,7 +246,9 @@ class DStarLiteView(object):
                 self.appState= AppState.planPresent
                 self.h0Check.config(state="disabled")
                 self.neighbors.config(state="disabled")
-                self.planHint.set('Planning successful within ' + str(self.planner.planSteps) + ' steps')
+                self.cbHeuristic.config(state="disabled")
+                self.planHint.set('Planning successful within ' + str(self.planner.planSteps) + ' steps' +
+                                  (', epsilon ' + str(self.planner.epsilon) if self.planner.anytime else ''))
                 messagebox.showinfo('Hint', 'Plan is ready')
             else:
                 self.appState= AppState.inDesign
@@ -180,10 +270,12 @@ class DStarLiteView(object):
             messagebox.showinfo('Hint', 'No plan present. Goto design and planning tab.')
         else:
             self.appState= AppState.inExecution
+            self.clearPendingChanges()
             self.tab_control.tab(0, state="disabled")
             self.tab_control.tab(1, state="disabled")
-            self.clickModeVal.set(3) #Obstacle Mode
-            self.execHint.set('Click to add obstacles during plan execution')
+            if self.clickModeVal.get() != 4:
+                self.clickModeVal.set(3) #Obstacle Mode
+            self.execHint.set('Click to change obstacles or terrain during plan execution')
             result= self.planner.executePlan(self.cbExecMode.get())  
             if result[0]:
                 messagebox.showinfo('Hint', 'Plan has been executed!')
@@ -238,9 +330,8 @@ class DStarLiteView(object):
                     if clickMode == 1:
                         #Set start node
                         if self.planner.getStartCoordinates()[0] != float('inf'):
-                            tag= str(self.planner.getStartCoordinates()[0]) + '-' + str(self.planner.getStartCoordinates()[1])
-                            handle=self.canvGrid.find_withtag(tag)
-                            self.canvGrid.itemconfig(handle, fill= "white")
+                            oldStart= self.planner.getStartCoordinates()
+                            self.updateColor(self.planner.vertexGrid[oldStart[0]][oldStart[1]], "white")
                         self.canvGrid.itemconfig(result[3], fill="green")
                         self.planner.setStartCoordinates(x,y)
                     elif clickMode == 2:
@@ -248,9 +339,7 @@ class DStarLiteView(object):
                         oldGoal= self.planner.getGoalCoordinates()[0] != float('inf')
                         if oldGoal:
                             oldGoalCoord= self.planner.getGoalCoordinates()
-                            tag= str(oldGoalCoord[0]) + '-' + str(oldGoalCoord[1])
-                            handle=self.canvGrid.find_withtag(tag)
-                            self.canvGrid.itemconfig(handle, fill= "white")
+                            self.updateColor(self.planner.vertexGrid[oldGoalCoord[0]][oldGoalCoord[1]], "white")
                         self.canvGrid.itemconfig(result[3], fill="red")
                         self.planner.setGoalCoordinates(x,y)
                         self.update_rsh(x,y)
@@ -259,33 +348,69 @@ class DStarLiteView(object):
                     elif clickMode == 3:
                         #Set or reset obstacale node
                         node= self.planner.vertexGrid[int(x)][int(y)]
-                        if not node.isObstacle:
+                        if self.appState == AppState.inExecution:
+                            #Collect the changes. The executer applies them
+                            #as one batch at the next step.
+                            if node in self.pendingObstacles:
+                                self.pendingObstacles.remove(node)
+                                self.updateColor(node, "white")
+                            elif not node.isObstacle:
+                                self.pendingObstacles.append(node)
+                                self.updateColor(node, "brown")
+                            elif node not in self.pendingFreed:
+                                self.pendingFreed.append(node)
+                                self.updateColor(node, "white")
+                        elif not node.isObstacle:
                             node.isObstacle= True
                             self.canvGrid.itemconfig(result[3], fill="brown")
                             self.planner.obstacles.add(node)
-                        elif not self.appState == AppState.inExecution:
-                            #Obstacles can only be removed in Design
+                        else:
                             node.isObstacle= False
-                            self.canvGrid.itemconfig(result[3], fill="white")
+                            self.updateColor(node, "white")
                             self.planner.obstacles.remove(node)
                         self.update_rsh(x,y)
+                    elif clickMode == 4:
+                        #Set the terrain cost of a vertex
+                        node= self.planner.vertexGrid[int(x)][int(y)]
+                        cost= float(self.terrainCostVal.get())
+                        if self.appState == AppState.inExecution:
+                            self.pendingCosts.append((node, cost))
+                            self.canvGrid.itemconfig(result[3], fill=self.terrainColorOf(cost))
+                        else:
+                            self.planner.setCost(x, y, cost)
+                            self.updateColor(node, "white")
         else: 
             self.show('Action not possible in this state of planning. Recreate grid.')
             
     def show(self, aMessage):
         messagebox.showinfo('Hint', aMessage)
 
+    #Return the changes clicked during plan execution since the last call
+    #as lists (new obstacles, removed obstacles, (vertex, terrain cost))
+    #and forget them
+    def takePendingChanges(self):
+        result= (self.pendingObstacles, self.pendingFreed, self.pendingCosts)
+        self.clearPendingChanges()
+        return result
+
+    def clearPendingChanges(self):
+        self.pendingObstacles= []
+        self.pendingFreed= []
+        self.pendingCosts= []
+
     #### Functions ############################################################
     
     #Create a new planner and draw the grid
     def createGrid(self):
         #Create a planner and initialize it
         print('Creating planner')
+        self.clearPendingChanges() #Changes clicked during plan execution
         self.planner= DStarLitePlanner(self, 
                                gridWidth=self.gridWidthVal.get(),
                                gridHeight= self.gridHeightVal.get(),
                                hIsZero= self.h0_check.get(),
                                directNeighbors= self.directNeigbors.get()) 
+        self.planner.planCache= self.planCache
         horizShift= 30
         self.canvGrid = Canvas(self.master, height=800,width= 600 + horizShift)
         self.canvGrid.bind("<Button-1>", self.canv_clicked)
@@ -326,6 +451,22 @@ class DStarLiteView(object):
             self.canvGrid.create_text(i+horizShift+self.stepX/2, 400+ 15, text=str(columnCount))
             columnCount+=1
     
+    #Show start, goal, obstacles and terrain costs of the planner
+    def drawDesign(self):
+        for column in self.planner.vertexGrid:
+            for node in column:
+                if node.isObstacle:
+                    self.updateColor(node, "brown")
+                elif node.cost != 1:
+                    self.updateColor(node, "white")
+        if self.planner.getStartCoordinates()[0] != float('inf'):
+            x, y= self.planner.getStartCoordinates()
+            self.updateColor(self.planner.vertexGrid[x][y], "green")
+        if self.planner.getGoalCoordinates()[0] != float('inf'):
+            x, y= self.planner.getGoalCoordinates()
+            self.updateColor(self.planner.vertexGrid[x][y], "red")
+            self.update_rsh(x, y)
+
     #Update rsh-value on screen
     def update_rsh(self, x,y):
         tag= 'rsh-'+ str(x) + '-' + str(y)
@@ -344,11 +485,34 @@ class DStarLiteView(object):
         self.canvGrid.itemconfig(handle, text='g:' + str(value))
 
     # Update-color of vertex on screen if it is not the start- or goal-node
+    # White is replaced by the color of the terrain cost.
     def updateColor(self, aVertex, aColor):
+        if aColor == "white":
+            aColor= self.terrainColorOf(aVertex.cost)
         tag= str(aVertex.x) + '-' + str(aVertex.y)
         handle=self.canvGrid.find_withtag(tag)
         self.canvGrid.itemconfig(handle, fill= aColor)
 
+    # Interactive behavior after each planning step depending on the
+    # planning mode (see DStarLitePlanner.mainPlanning)
+    def planStepDone(self):
+        if self.planner.stepDelay > 0:
+            time.sleep(self.planner.stepDelay)
+            self.master.update()
+        elif self.planner.stepDelay < 0:
+            self.show('Press ok for next step')
+
+    #Anytime D* has published a path: show it at once
+    def pathPublished(self, epsilon):
+        self.planHint.set('Path found, costs <= ' + str(epsilon) + ' x optimal')
+        self.master.update()
+
+    #Return the background color of a free vertex with the given terrain cost
+    def terrainColorOf(self, cost):
+        for maxCost, color in terrainColors:
+            if cost <= maxCost:
+                return color
+
     #Check if the clicked rectangle is occupied by other or the same
     #type of node regarding the clickMode 
     def isNodeOccupied(self,x,y,clickMode):
@@ -357,7 +521,7 @@ class DStarLiteView(object):
             goal= self.planner.getGoalCoordinates()
             if [int(x),int(y)] != goal:
                 ob= self.planner.vertexGrid[int(x)][int(y)].isObstacle
-                if ob and clickMode <= 2:
+                if ob and clickMode != 3:
                     messagebox.showwarning('Vertex occupied', 'The vertex is occupied by an obstacle')
                     return True
                 else:
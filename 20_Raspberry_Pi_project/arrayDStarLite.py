@@ -0,0 +1,580 @@
+#!/usr/bin/python3
+############################################################
+# Class ArrayDStarLite
+# This class implements the planning algorithm D* Lite
+# (see Sven Koenig, Maxim Likhachev, 2002) on an ArrayGrid.
+# Vertices are integer cell ids, all planning state is
+# stored in NumPy arrays. The priority queue is a binary
+# heap with lazy deletion: the valid key of every cell
+# is stored in the arrays key1/key2 of the grid, heap
+# entries with another key are skipped.
+# The first search of a plan expands whole waves of cells
+# with NumPy (see searchWave), the replanning repairs the
+# search cell by cell.
+# The interface follows DStarLiteEngine, so both engines
+# can be used for headless planning. Terrain cost factors
+# are handled like in DStarLiteEngine. A precomputed
+# distance field or a NumPy wavefront can seed the planning
+# (see useDistanceFields and useWavefront).
+#
+# File: arrayDStarLite.py
+# Version: 1.0    Date: 18.10.2026
+###########################################################
+
+import heapq
+import time
+import numpy as np
+from arrayGrid import ArrayGrid, VertexGridView
+from planMetrics import PlanMetrics
+import distanceFields
+from vertex import KEY_ROUNDING
+
+#Growth factor of the bound of searchWave
+WAVE_GROWTH= 1.5
+
+class ArrayDStarLite(object):
+
+    #Create a new initialized ArrayDStarLite planner
+    #observer receives all changes of the planning state (see DStarLiteEngine.PlanObserver)
+    #metrics collects counters and events (see planMetrics.py)
+    def __init__(self, gridWidth=5, gridHeight= 4, hIsZero= True, directNeighbors=False,
+                 observer=None, metrics=None):
+        self.grid= ArrayGrid(gridWidth, gridHeight)
+        self.vertexGrid= VertexGridView(self.grid)
+        self.width= gridWidth
+        self.height= gridHeight
+        self.hIsZero= hIsZero
+        self.directNeighbors= directNeighbors # false=8, true=4
+        self.observer= observer
+        self.metrics= metrics if metrics is not None else PlanMetrics()
+        self.counters= self.metrics.counters
+        self.start= None      #cell id of the start vertex (actual robot position)
+        self.goal= None       #cell id of the goal vertex
+        self.last= None       #cell id of the start vertex at the last replanning
+        self.k= 0.0
+        self.heap= []         #entries (key1, key2, cellId)
+        self.queueCount= 0    #number of cells in the queue
+        self.planSteps= 0
+        self.planReady= False
+        self.actualPath= []   #cell ids from start to goal
+        self.distanceFields= None #FieldStore with precomputed g-values, see useDistanceFields
+        self.wavefront= False #Bootstrap the first search with a wavefront, see useWavefront
+        self.waveSearch= True #First search of a plan with NumPy arrays, see searchWave
+        self.waveSteps= 0     #Cells expanded by the wave of the last plan
+
+    #### Functions for the design of the grid ##################################################
+
+    def setStartCoordinates(self, x=0, y=0):
+        self.start= self.grid.cellId(x, y)
+
+    def getStartCoordinates(self):
+        return list(self.grid.coordinates(self.start))
+
+    def setGoalCoordinates(self, x=0, y=0):
+        if self.goal is not None:
+            self.grid.rshView[self.goal]= float('inf')
+        self.goal= self.grid.cellId(x, y)
+        self.grid.rshView[self.goal]= 0.0
+
+    def getGoalCoordinates(self):
+        return list(self.grid.coordinates(self.goal))
+
+    #Set or reset an obstacle at x,y
+    def setObstacle(self, x, y, isObstacle=True):
+        self.grid.obstacleView[self.grid.cellId(x, y)]= 1 if isObstacle else 0
+
+    #Set the terrain cost factor of x,y before planning
+    def setCost(self, x, y, cost):
+        self.checkCost(cost)
+        self.grid.costView[self.grid.cellId(x, y)]= cost
+
+    #Set start, goal, obstacles and terrain costs from a GridMap
+    #(see mapFile.py). The arrays of the map are used without copying
+    #them, a memory-mapped map is only read when planning needs a cell.
+    def applyMap(self, gridMap):
+        if gridMap.width != self.width or gridMap.height != self.height:
+            raise Exception('Map size ' + str(gridMap.width) + 'x' + str(gridMap.height) +
+                            ' does not match the grid')
+        self.grid.useArrays(gridMap.obstacle, gridMap.cost)
+        if gridMap.start is not None:
+            self.setStartCoordinates(*gridMap.start)
+        if gridMap.goal is not None:
+            self.setGoalCoordinates(*gridMap.goal)
+
+    #Seed the planning with the distance fields of a FieldStore (see distanceFields.py)
+    def useDistanceFields(self, fieldStore):
+        self.distanceFields= fieldStore
+
+    #Bootstrap the first search with a NumPy wavefront from the goal
+    #(see DStarLiteEngine.useWavefront)
+    def useWavefront(self, aBool=True):
+        self.wavefront= aBool
+
+    #Return the distance field of the goal on the actual map
+    def wavefrontField(self):
+        grid= self.grid
+        return distanceFields.DistanceField(
+            self.width, self.height, tuple(self.getGoalCoordinates()), self.directNeighbors,
+            grid.obstacle, grid.cost,
+            distanceFields.wavefront(self.width, self.height, grid.obstacle, grid.cost,
+                                     self.getGoalCoordinates(), self.directNeighbors))
+
+    #A cost factor < 1 would make the heuristic overestimate
+    def checkCost(self, cost):
+        if not 1 <= cost < float('inf'):
+            raise Exception('Terrain cost must be >= 1 and finite: ' + str(cost))
+
+    #### Priority queue ##########################################################
+
+    #Insert a cell or update its key
+    def queueInsert(self, cellId, key):
+        grid= self.grid
+        if not grid.inQueueView[cellId]:
+            grid.inQueueView[cellId]= 1
+            self.queueCount+= 1
+            self.counters['heapPush']+= 1
+        else:
+            self.counters['heapUpdate']+= 1
+        grid.key1View[cellId]= key[0]
+        grid.key2View[cellId]= key[1]
+        heapq.heappush(self.heap, (key[0], key[1], cellId))
+        if len(self.heap) > 64 and len(self.heap) > 4 * self.queueCount:
+            self.compactQueue()
+
+    def queueRemove(self, cellId):
+        if self.grid.inQueueView[cellId]:
+            self.grid.inQueueView[cellId]= 0
+            self.queueCount-= 1
+            self.counters['heapRemove']+= 1
+
+    #Remove heap entries which do not hold the valid key of their cell
+    def dropStaleTop(self):
+        heap= self.heap
+        grid= self.grid
+        while heap:
+            k1, k2, cellId= heap[0]
+            if grid.inQueueView[cellId] and grid.key1View[cellId] == k1 and \
+               grid.key2View[cellId] == k2:
+                return
+            heapq.heappop(heap)
+
+    def queueTopKey(self):
+        self.dropStaleTop()
+        if not self.heap:
+            return (float('inf'), float('inf'))
+        return self.heap[0][:2]
+
+    def queuePop(self):
+        self.dropStaleTop()
+        k1, k2, cellId= heapq.heappop(self.heap)
+        self.grid.inQueueView[cellId]= 0
+        self.queueCount-= 1
+        self.counters['heapPop']+= 1
+        return cellId
+
+    #Rebuild the heap with the valid entries only
+    def compactQueue(self):
+        grid= self.grid
+        self.heap= [e for e in self.heap if grid.inQueueView[e[2]] and
+                    grid.key1View[e[2]] == e[0] and grid.key2View[e[2]] == e[1]]
+        heapq.heapify(self.heap)
+
+    ##### D* Lite Algorithm #############################################################
+
+    #Calculate the heuristic-value of a cell regarding the start cell: the
+    #octile distance never overestimates straight (1) and diagonal (1.4)
+    #moves, the euclidean distance would (sqrt(2) > 1.4)
+    def h(self, cellId, startId):
+        if self.hIsZero:
+            return 0
+        x, y= divmod(cellId, self.height)
+        sx, sy= divmod(startId, self.height)
+        dx, dy= abs(x - sx), abs(y - sy)
+        if self.directNeighbors:
+            return dx + dy
+        return max(dx, dy) + 0.4 * min(dx, dy)
+
+    #CalculateKey function of the D*Lite algorithm (rounded like in vertex.py)
+    def calculateKey(self, cellId):
+        g= self.grid.gView[cellId]
+        rsh= self.grid.rshView[cellId]
+        min1= g if g < rsh else rsh
+        return (min1 + self.h(cellId, self.start) + self.k + KEY_ROUNDING - KEY_ROUNDING, min1)
+
+    #Initialize the planning process ("Initialize" procedure of D*Lite)
+    def initializePlanning(self):
+        self.resetSearch()
+        self.moves= self.grid.moveTable(self.directNeighbors)
+        self.mask= self.grid.neighborMask(self.directNeighbors)
+        field= None
+        if self.distanceFields is not None:
+            field= self.distanceFields.find(self.width, self.height, self.getGoalCoordinates(),
+                                            self.directNeighbors)
+        if field is None and self.wavefront:
+            field= self.wavefrontField()
+        if field is not None:
+            self.seedFromField(field)
+        elif self.waveSearch:
+            self.searchWave()
+        else:
+            self.queueInsert(self.goal, self.calculateKey(self.goal))
+
+    #Forget the search of a previous plan: g and rsh of all cells are inf
+    #again (rsh of the goal 0), the queue is empty
+    def resetSearch(self):
+        grid= self.grid
+        searched= np.flatnonzero(np.isfinite(grid.g) | np.isfinite(grid.rsh))
+        grid.g.fill(float('inf'))
+        grid.rsh.fill(float('inf'))
+        grid.rsh[self.goal]= 0.0
+        if self.observer is not None:
+            for cellId in searched.tolist():
+                self.observer.update_g(*divmod(cellId, self.height))
+                self.observer.update_rsh(*divmod(cellId, self.height))
+        grid.key1.fill(float('inf'))
+        grid.key2.fill(float('inf'))
+        grid.inQueue.fill(0)
+        self.heap= []
+        self.queueCount= 0
+        self.k= 0.0
+        self.last= self.start
+        self.waveSteps= 0
+
+    #Initialize g and rsh of all cells from a precomputed distance field
+    #(see distanceFields.py and DStarLiteEngine.seedFromField)
+    def seedFromField(self, field):
+        grid= self.grid
+        grid.g[:]= field.g
+        grid.rsh[:]= field.g
+        if self.observer is not None:
+            for cellId in np.flatnonzero(np.isfinite(grid.g)).tolist():
+                self.observer.update_g(*divmod(cellId, self.height))
+                self.observer.update_rsh(*divmod(cellId, self.height))
+        oldStates= {}
+        for cellId in field.changedCells(grid.obstacle, grid.cost).tolist():
+            oldStates[cellId]= (field.obstacle[cellId] != 0,
+                                float(field.cost[cellId]) if field.cost is not None else 1.0)
+        self.metrics.event('seedFromField', goal=tuple(field.goal), changed=len(oldStates))
+        self.updateChangedEdges(oldStates)
+
+    #First search of a plan: a wave from the goal expands all cells of the
+    #wave at once with NumPy, in the order of their distance to the goal
+    #only up to a bound. The bound grows until it reaches the distance of
+    #the start. Cells within the bound get their exact distance as g and
+    #rsh. Cells behind the front get their tentative distance as rsh and
+    #join the queue. This is the state of D* Lite after ComputeShortestPath,
+    #the replanning continues from it cell by cell.
+    def searchWave(self):
+        grid= self.grid
+        free= np.asarray(grid.obstacle) == 0
+        cost= np.asarray(grid.cost)
+        mask= np.asarray(self.mask)
+        distance= np.full(grid.size, float('inf'))
+        distance[self.goal]= 0.0
+        #The octile distance (4 neighbors: manhattan) is a lower bound
+        dx, dy= [abs(a - b) for a, b in zip(self.getStartCoordinates(), self.getGoalCoordinates())]
+        bound= dx + dy if self.directNeighbors else max(dx, dy) + 0.4 * min(dx, dy)
+        active= np.array([self.goal] if free[self.goal] else [], dtype=np.int64)
+        while True:
+            while len(active):
+                self.waveSteps+= len(active)
+                if len(active) < distanceFields.SMALL_WAVE:
+                    active= self.relaxCells(active, distance, bound)
+                    continue
+                activeMask= mask[active]
+                changed= []
+                for bit, offset, moveCost in self.moves:
+                    u= active[(activeMask & bit) != 0]
+                    s= u + offset
+                    reachable= free[s]
+                    u= u[reachable]
+                    s= s[reachable]
+                    #Same operations as calcRsh, so g and rsh match it exactly
+                    value= moveCost * (cost[s] + cost[u]) * 0.5 + distance[u]
+                    better= value < distance[s]
+                    s= s[better]
+                    distance[s]= value[better]
+                    changed.append(s)
+                changed= np.unique(np.concatenate(changed))
+                active= changed[distance[changed] <= bound]
+            front= np.isfinite(distance) & (distance > bound)
+            if distance[self.start] <= bound or not front.any():
+                break
+            bound= max(min(distance[self.start], bound * WAVE_GROWTH), distance[front].min())
+            active= np.flatnonzero(front & (distance <= bound))
+        grid.g[:]= np.where(distance <= bound, distance, float('inf'))
+        grid.rsh[:]= distance
+        if self.observer is not None:
+            for cellId in np.flatnonzero(np.isfinite(distance)).tolist():
+                self.observer.update_g(*divmod(cellId, self.height))
+                self.observer.update_rsh(*divmod(cellId, self.height))
+        for cellId in np.flatnonzero(front).tolist():
+            self.queueInsert(cellId, self.calculateKey(cellId))
+        self.counters['expansions']+= self.waveSteps
+        self.metrics.event('searchWave', steps=self.waveSteps, front=int(front.sum()))
+
+    #Narrow waves of searchWave are relaxed cell by cell like in
+    #distanceFields.relaxCells. Return the changed cells within the bound.
+    def relaxCells(self, active, distance, bound):
+        distanceView= memoryview(distance)
+        obstacleView= self.grid.obstacleView
+        costView= self.grid.costView
+        changed= set()
+        for u in active.tolist():
+            mask= self.mask[u]
+            distanceU= distanceView[u]
+            costU= costView[u]
+            for bit, offset, moveCost in self.moves:
+                if mask & bit:
+                    s= u + offset
+                    if not obstacleView[s]:
+                        value= moveCost * (costView[s] + costU) * 0.5 + distanceU
+                        if value < distanceView[s]:
+                            distanceView[s]= value
+                            if value <= bound:
+                                changed.add(s)
+        return np.array(sorted(changed), dtype=np.int64)
+
+    #Return the neighbor cell ids of a cell
+    def neighbors(self, cellId):
+        mask= self.mask[cellId]
+        return [cellId + offset for bit, offset, cost in self.moves if mask & bit]
+
+    #Function implements the UpdateVertex procedure of the D*Lite algorithm
+    def updateVertex(self, cellId):
+        self.counters['vertexUpdates']+= 1
+        if cellId != self.goal:
+            self.grid.rshView[cellId]= self.calcRsh(cellId)
+            if self.observer is not None:
+                self.observer.update_rsh(*divmod(cellId, self.height))
+        self.updateQueue(cellId)
+
+    #Calculate the rsh-value of a cell from its neighbors
+    def calcRsh(self, cellId):
+        grid= self.grid
+        gView= grid.gView
+        obstacleView= grid.obstacleView
+        costView= grid.costView
+        rsh= float('inf')
+        if not obstacleView[cellId]:
+            mask= self.mask[cellId]
+            cellCost= costView[cellId]
+            for bit, offset, cost in self.moves:
+                if mask & bit:
+                    s= cellId + offset
+                    if not obstacleView[s]:
+                        value= cost * (cellCost + costView[s]) * 0.5 + gView[s]
+                        if value < rsh:
+                            rsh= value
+        return rsh
+
+    #Insert, update or remove a cell in the queue depending on its consistency
+    def updateQueue(self, cellId):
+        if self.grid.gView[cellId] != self.grid.rshView[cellId]:
+            self.queueInsert(cellId, self.calculateKey(cellId))
+        else:
+            self.queueRemove(cellId)
+
+    #Function implements the ComputeShortestPath function of the D*Lite algorithm
+    def computeShortestPath(self):
+        with self.metrics.phase('computeShortestPath'):
+            self.computeShortestPathLoop()
+
+    #The loop of the ComputeShortestPath function
+    def computeShortestPathLoop(self):
+        self.planSteps= 0
+        counters= self.counters
+        grid= self.grid
+        gView= grid.gView
+        rshView= grid.rshView
+        start= self.start
+        while True:
+            k_old= self.queueTopKey()
+            if not (k_old < self.calculateKey(start) or rshView[start] != gView[start]):
+                break
+            u= self.queuePop()
+            k= self.calculateKey(u)
+            if k_old < k:
+                self.queueInsert(u, k)
+            elif gView[u] > rshView[u]:
+                gView[u]= rshView[u]
+                if self.observer is not None:
+                    self.observer.update_g(*divmod(u, self.height))
+                for s in self.neighbors(u):
+                    self.updateVertex(s)
+            else:
+                gView[u]= float('inf')
+                if self.observer is not None:
+                    self.observer.update_g(*divmod(u, self.height))
+                for s in self.neighbors(u):
+                    self.updateVertex(s)
+                self.updateVertex(u)
+            self.planSteps+= 1
+            counters['expansions']+= 1
+
+    #Plan a path from start to goal. Return True if a plan exists.
+    def plan(self):
+        startTime= time.time()
+        with self.metrics.phase('initializePlanning'):
+            self.initializePlanning()
+        self.computeShortestPath()
+        self.planSteps+= self.waveSteps
+        self.planTime= time.time() - startTime
+        self.planReady= self.grid.gView[self.start] != float('inf')
+        with self.metrics.phase('extractPath'):
+            self.extractPath()
+        self.metrics.event('plan', seconds=self.planTime, steps=self.planSteps,
+                           planReady=self.planReady)
+        return self.planReady
+
+    #Calculate the successor of a cell on the cheapest path: the neighbor s
+    #with the smallest cost(cellId, s) + g(s), None if no neighbor can be reached
+    def calcCheapestNeighbor(self, cellId):
+        grid= self.grid
+        gView= grid.gView
+        obstacleView= grid.obstacleView
+        costView= grid.costView
+        cheapest= None
+        best= float('inf')
+        if not obstacleView[cellId]:
+            mask= self.mask[cellId]
+            cellCost= costView[cellId]
+            for bit, offset, cost in self.moves:
+                if mask & bit:
+                    s= cellId + offset
+                    if not obstacleView[s]:
+                        value= cost * (cellCost + costView[s]) * 0.5 + gView[s]
+                        if value < best:
+                            best= value
+                            cheapest= s
+        return cheapest
+
+    #Remember the path from the start cell to the goal
+    def extractPath(self):
+        self.actualPath= []
+        node= self.start
+        while node != self.goal and self.planReady:
+            self.actualPath.append(node)
+            node= self.calcCheapestNeighbor(node)
+            self.planReady= node is not None and self.grid.gView[node] != float('inf')
+            if len(self.actualPath) > self.grid.size:
+                #The g-values after ComputeShortestPath decrease along the
+                #cheapest successors: a cycle is an error of the planning
+                raise Exception('Path from ' + str(self.getStartCoordinates()) +
+                                ' runs in a cycle')
+        if self.planReady:
+            self.actualPath.append(self.goal)
+
+    #Return the actual path as list of [x, y] coordinates
+    def pathCoordinates(self):
+        return [list(divmod(cellId, self.height)) for cellId in self.actualPath]
+
+    # A new obstacle at cellId has been found after the robot moved to
+    # self.start. Replan the path to goal. Return if a plan exists.
+    def replanning(self, cellId):
+        return self.applyChanges(blocked=(cellId,))
+
+    # Several cells changed: blocked cells became obstacles, freed cells
+    # are no obstacles anymore, costs is a sequence of (cellId, new terrain
+    # cost factor). The changed edges are updated with the edge-change
+    # rules of D* Lite (see DStarLiteEngine.applyChanges), then the path
+    # is replanned once for all changes. The rsh-values of the cells in
+    # recompute are calculated again, e.g. after their neighbor mask has
+    # changed (both cells of a changed move must be given).
+    # Return if a plan exists.
+    def applyChanges(self, blocked=(), freed=(), costs=(), recompute=()):
+        self.metrics.count('replans')
+        self.metrics.event('replanning', blocked=list(blocked), freed=list(freed),
+                           costs=list(costs))
+        with self.metrics.phase('replanning'):
+            self.k= self.k + self.h(self.last, self.start)
+            self.last= self.start
+            obstacleView= self.grid.obstacleView
+            costView= self.grid.costView
+            #Old states (isObstacle, cost) of the changed cells
+            oldStates= {}
+            for cellId in blocked:
+                oldStates[cellId]= (False, costView[cellId])
+            for cellId in freed:
+                oldStates[cellId]= (True, costView[cellId])
+            for cellId, cost in costs:
+                oldStates.setdefault(cellId, (obstacleView[cellId] != 0, costView[cellId]))
+            for cellId in blocked:
+                obstacleView[cellId]= 1
+            for cellId in freed:
+                obstacleView[cellId]= 0
+            for cellId, cost in costs:
+                self.checkCost(cost)
+                costView[cellId]= cost
+            self.updateChangedEdges(oldStates)
+            for cellId in recompute:
+                self.updateVertex(cellId)
+            self.computeShortestPath()
+        self.planReady= self.grid.gView[self.start] != float('inf')
+        with self.metrics.phase('extractPath'):
+            self.extractPath()
+        return self.planReady
+
+    # The cells of oldStates (cellId -> old (isObstacle, cost)) have new
+    # states. Each changed edge is handled once in both directions with the
+    # edge-change rules, then each affected cell is queued once.
+    def updateChangedEdges(self, oldStates):
+        obstacleView= self.grid.obstacleView
+        costView= self.grid.costView
+        affected= {}
+        handled= set()
+        for u, uOld in oldStates.items():
+            affected[u]= True
+            handled.add(u)
+            uNew= (obstacleView[u] != 0, costView[u])
+            mask= self.mask[u]
+            for bit, offset, distance in self.moves:
+                v= u + offset
+                if not mask & bit or v in handled:
+                    continue
+                vNew= (obstacleView[v] != 0, costView[v])
+                vOld= oldStates.get(v, vNew)
+                oldCost= self.edgeCost(distance, uOld, vOld)
+                newCost= self.edgeCost(distance, uNew, vNew)
+                if oldCost != newCost:
+                    self.updateEdge(u, v, oldCost, newCost)
+                    self.updateEdge(v, u, oldCost, newCost)
+                affected[v]= True
+        self.counters['vertexUpdates']+= len(affected)
+        for cellId in affected:
+            self.updateQueue(cellId)
+
+    #Calculate the cost of an edge with the given distance from the
+    #states (isObstacle, cost) of both cells
+    def edgeCost(self, distance, state1, state2):
+        if state1[0] or state2[0]:
+            return float('inf')
+        return distance * (state1[1] + state2[1]) * 0.5
+
+    # Edge-change rule of D* Lite for the edge from u to its successor v
+    def updateEdge(self, u, v, oldCost, newCost):
+        if u == self.goal:
+            return
+        rshView= self.grid.rshView
+        if oldCost > newCost:
+            value= newCost + self.grid.gView[v]
+            if value >= rshView[u]:
+                return
+            rshView[u]= value
+        elif rshView[u] == oldCost + self.grid.gView[v]:
+            rshView[u]= self.calcRsh(u)
+        else:
+            return
+        if self.observer is not None:
+            self.observer.update_rsh(*divmod(u, self.height))
+
+if __name__ == "__main__":
+    planner= ArrayDStarLite(gridWidth=300, gridHeight=300, hIsZero=False, directNeighbors=False)
+    for y in range(0, 290):
+        planner.setObstacle(150, y)
+    planner.setStartCoordinates(0, 0)
+    planner.setGoalCoordinates(299, 0)
+    planner.plan()
+    print('Plan ready:', planner.planReady, 'steps:', planner.planSteps,
+          'time:', round(planner.planTime, 3), 's', 'cost:', planner.grid.g[planner.start])
+    print('Bytes per cell:', planner.grid.nbytes() / planner.grid.size)
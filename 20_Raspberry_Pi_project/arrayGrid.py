@@ -0,0 +1,182 @@
+#!/usr/bin/python3
+############################################################
+# Classes ArrayGrid, GridVertex and VertexGridView
+# The class ArrayGrid stores the planning state of all
+# vertices of a grid in contiguous NumPy arrays indexed
+# by a flat cell id: id = x * height + y.
+# This needs far less memory per cell than a grid of
+# Vertex objects. GridVertex is a thin Vertex-like view
+# on one cell, VertexGridView allows the access
+# vertexGrid[x][y] like in DStarLiteEngine.
+#
+# File: arrayGrid.py
+# Version: 1.0    Date: 18.10.2026
+###########################################################
+
+import numpy as np
+
+#Moves to the neighbors of a cell: (dx, dy, cost). Bit i of the
+#neighbor mask of a cell is set if move i stays inside of the grid.
+#The order of the moves is the order of DStarLiteEngine.neighbors().
+DIRECT_MOVES = ((-1, 0, 1), (1, 0, 1), (0, -1, 1), (0, 1, 1))
+ALL_MOVES = ((-1, -1, 1.4), (-1, 0, 1), (-1, 1, 1.4), (0, -1, 1),
+             (0, 1, 1), (1, -1, 1.4), (1, 0, 1), (1, 1, 1.4))
+
+class ArrayGrid(object):
+
+    #Create a new grid. All g- and rsh-values are inf, no obstacles.
+    def __init__(self, gridWidth=5, gridHeight=4):
+        self.width= gridWidth
+        self.height= gridHeight
+        self.size= gridWidth * gridHeight
+        self.g= np.full(self.size, float('inf'))
+        self.rsh= np.full(self.size, float('inf'))
+        self.obstacle= np.zeros(self.size, dtype=np.uint8)
+        self.cost= np.ones(self.size)  #Terrain cost factor (>= 1) of every cell
+        #Key of every cell in the priority queue (valid if inQueue is 1)
+        self.key1= np.full(self.size, float('inf'))
+        self.key2= np.full(self.size, float('inf'))
+        self.inQueue= np.zeros(self.size, dtype=np.uint8)
+        self.directMask= self.createNeighborMask(DIRECT_MOVES)
+        self.allMask= self.createNeighborMask(ALL_MOVES)
+        self.bindViews()
+
+    #Memoryviews allow fast access to single cells from Python code.
+    #They have to be bound again if an array is replaced.
+    def bindViews(self):
+        self.gView= memoryview(self.g)
+        self.rshView= memoryview(self.rsh)
+        self.obstacleView= memoryview(self.obstacle)
+        self.costView= memoryview(self.cost)
+        self.key1View= memoryview(self.key1)
+        self.key2View= memoryview(self.key2)
+        self.inQueueView= memoryview(self.inQueue)
+
+    #Use the given obstacle and cost arrays (e.g. of a memory-mapped
+    #map) instead of the own arrays. cost None keeps the own costs.
+    def useArrays(self, obstacle, cost=None):
+        if obstacle.dtype != np.uint8 or len(obstacle) != self.size:
+            raise Exception('Obstacle array must have ' + str(self.size) + ' uint8 values')
+        self.obstacle= obstacle
+        if cost is not None:
+            if cost.dtype != np.float64 or len(cost) != self.size:
+                raise Exception('Cost array must have ' + str(self.size) + ' float64 values')
+            self.cost= cost
+        self.bindViews()
+
+    #Return an array with one bit per move for every cell.
+    #The bit is set if the move stays inside of the grid.
+    def createNeighborMask(self, moves):
+        ids= np.arange(self.size)
+        xs= ids // self.height
+        ys= ids % self.height
+        mask= np.zeros(self.size, dtype=np.uint8)
+        for bit, (dx, dy, cost) in enumerate(moves):
+            inside= (xs + dx >= 0) & (xs + dx < self.width) & \
+                    (ys + dy >= 0) & (ys + dy < self.height)
+            mask|= inside.astype(np.uint8) << bit
+        return memoryview(mask)
+
+    #Return the moves as tuples (bit, id-offset, cost)
+    def moveTable(self, directNeighbors):
+        moves= DIRECT_MOVES if directNeighbors else ALL_MOVES
+        return tuple((1 << bit, dx * self.height + dy, cost)
+                     for bit, (dx, dy, cost) in enumerate(moves))
+
+    #Return the neighbor mask of the given connectivity
+    def neighborMask(self, directNeighbors):
+        return self.directMask if directNeighbors else self.allMask
+
+    #Replace the neighbor mask of the given connectivity, e.g. to close
+    #moves between cells. mask is a uint8 array with one byte per cell.
+    def setNeighborMask(self, directNeighbors, mask):
+        if directNeighbors:
+            self.directMask= memoryview(mask)
+        else:
+            self.allMask= memoryview(mask)
+
+    def cellId(self, x, y):
+        return int(x) * self.height + int(y)
+
+    def coordinates(self, cellId):
+        return divmod(cellId, self.height)
+
+    #Return the memory used by the arrays in bytes
+    def nbytes(self):
+        return self.g.nbytes + self.rsh.nbytes + self.obstacle.nbytes + \
+               self.cost.nbytes + self.key1.nbytes + self.key2.nbytes + self.inQueue.nbytes + \
+               self.directMask.nbytes + self.allMask.nbytes
+
+
+class GridVertex(object):
+
+    #Create a view on the cell x,y of an ArrayGrid
+    def __init__(self, grid, x, y):
+        self.grid= grid
+        self.x= x
+        self.y= y
+        self.id= grid.cellId(x, y)
+
+    @property
+    def g(self):
+        return self.grid.gView[self.id]
+
+    @property
+    def rsh(self):
+        return self.grid.rshView[self.id]
+
+    @property
+    def isObstacle(self):
+        return self.grid.obstacleView[self.id] != 0
+
+    @isObstacle.setter
+    def isObstacle(self, aBool):
+        self.grid.obstacleView[self.id]= 1 if aBool else 0
+
+    @property
+    def cost(self):
+        return self.grid.costView[self.id]
+
+    def __eq__(self, other):
+        return isinstance(other, GridVertex) and other.grid is self.grid and \
+               other.id == self.id
+
+    def __hash__(self):
+        return self.id
+
+    def print(self):
+        print('x:', self.x, 'y:', self.y, 'g:', self.g,
+              'rsh:', self.rsh, 'IsObstacle:', self.isObstacle)
+
+
+class VertexGridView(object):
+
+    #Allow the access vertexGrid[x][y] to the cells of an ArrayGrid
+    def __init__(self, grid):
+        self.grid= grid
+
+    def __getitem__(self, x):
+        return _VertexColumn(self.grid, x)
+
+    def __len__(self):
+        return self.grid.width
+
+
+class _VertexColumn(object):
+
+    def __init__(self, grid, x):
+        self.grid= grid
+        self.x= x
+
+    def __getitem__(self, y):
+        return GridVertex(self.grid, self.x, y)
+
+    def __len__(self):
+        return self.grid.height
+
+if __name__ == "__main__":
+    grid= ArrayGrid(1000, 1000)
+    print('Bytes per cell:', grid.nbytes() / grid.size)
+    v= VertexGridView(grid)[3][4]
+    v.isObstacle= True
+    v.print()
@@ -0,0 +1,266 @@
+#!/usr/bin/python3
+############################################################
+# Batch planning
+# Plan many scenarios (map, start, goal) headless in a
+# pool of worker processes (concurrent.futures) and yield
+# the results as they complete: path, cost, expansions
+# (planSteps) and planning time.
+# The maps are not pickled: every map is written once as
+# a map file (see mapFile.py) and the workers open it with
+# numpy.memmap, so all processes share the pages of the
+# operating system cache. Maps loaded with mapFile.loadMap
+# are used directly. A worker keeps its open maps for the
+# following scenarios.
+#
+# Usage example (JSON lines with map, start, goal):
+#   python3 batchPlanner.py --scenarios nightly.jsonl
+#           --workers 8 --output results.jsonl
+#
+# File: batchPlanner.py
+# Version: 1.0    Date: 18.10.2026
+###########################################################
+
+import argparse
+import concurrent.futures as cf
+import contextlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import mapFile
+
+class Scenario(object):
+
+    #A planning task. gridMap is a GridMap or the name of a map file.
+    #start and goal (x, y) default to the start and goal of the map.
+    #backend is 'objects' (DStarLiteEngine), 'arrays' (ArrayDStarLite)
+    #or 'hierarchical' (HierarchicalPlanner). name is returned with the result.
+    def __init__(self, gridMap, start=None, goal=None, name=None, backend='objects',
+                 hIsZero=False, directNeighbors=False, algorithm='Basic', heuristic=None):
+        if backend not in engineFactories:
+            raise Exception('Unknown backend: ' + str(backend))
+        self.gridMap= gridMap
+        self.start= start
+        self.goal= goal
+        self.name= name
+        self.backend= backend
+        self.hIsZero= hIsZero
+        self.directNeighbors= directNeighbors
+        self.algorithm= algorithm
+        self.heuristic= heuristic
+
+    #Arguments of planScenario without the map
+    def task(self):
+        return {'name': self.name, 'backend': self.backend, 'hIsZero': self.hIsZero,
+                'directNeighbors': self.directNeighbors, 'algorithm': self.algorithm,
+                'heuristic': self.heuristic,
+                'start': tuple(self.start) if self.start is not None else None,
+                'goal': tuple(self.goal) if self.goal is not None else None}
+
+#### Engines #################################################################
+
+def createObjectEngine(gridMap, task):
+    from DStarLiteEngine import DStarLiteEngine
+    engine= DStarLiteEngine(gridMap.width, gridMap.height, task['hIsZero'],
+                            task['directNeighbors'], algorithm=task['algorithm'],
+                            heuristic=task['heuristic'])
+    engine.applyMap(gridMap)
+    return engine
+
+def createArrayEngine(gridMap, task):
+    from arrayDStarLite import ArrayDStarLite
+    engine= ArrayDStarLite(gridMap.width, gridMap.height, task['hIsZero'],
+                           task['directNeighbors'])
+    engine.applyMap(gridMap)
+    return engine
+
+def createHierarchicalEngine(gridMap, task):
+    from hierarchicalPlanner import HierarchicalPlanner
+    engine= HierarchicalPlanner(gridMap.width, gridMap.height, task['hIsZero'],
+                                task['directNeighbors'])
+    engine.applyMap(gridMap)
+    return engine
+
+engineFactories= {'objects': createObjectEngine, 'arrays': createArrayEngine,
+                  'hierarchical': createHierarchicalEngine}
+
+#Return the path as list of (x, y) and its cost after a successful plan
+def pathAndCost(engine, backend):
+    if backend == 'objects':
+        return [(node.x, node.y) for node in engine.actualPath], engine.startNode.g
+    if backend == 'arrays':
+        return [tuple(c) for c in engine.pathCoordinates()], float(engine.grid.g[engine.start])
+    engine.completePath()
+    return [tuple(c) for c in engine.pathCoordinates()], engine.pathCost()
+
+#### Worker ##################################################################
+
+#Maps opened by this worker process: file name -> GridMap
+openMaps= {}
+
+#Open a map file once per worker (memory-mapped, changes stay private)
+def openMap(fileName):
+    gridMap= openMaps.get(fileName)
+    if gridMap is None:
+        gridMap= mapFile.loadMap(fileName)
+        openMaps[fileName]= gridMap
+    return gridMap
+
+#Plan one scenario in a worker process. Return a dictionary with
+#index, name, planReady, path, cost, expansions, time (seconds of
+#the planning) and error (None or the message of an exception).
+def planScenario(index, fileName, task):
+    result= {'index': index, 'name': task['name'], 'planReady': False, 'path': [],
+             'cost': None, 'expansions': 0, 'time': 0.0, 'error': None}
+    try:
+        gridMap= openMap(fileName)
+        start= task['start'] if task['start'] is not None else gridMap.start
+        goal= task['goal'] if task['goal'] is not None else gridMap.goal
+        if start is None or goal is None:
+            raise Exception('Scenario without start or goal')
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            startTime= time.perf_counter()
+            engine= engineFactories[task['backend']](gridMap, task)
+            engine.setStartCoordinates(*start)
+            engine.setGoalCoordinates(*goal)
+            planReady= engine.plan()
+            if planReady:
+                result['path'], result['cost']= pathAndCost(engine, task['backend'])
+            result['time']= time.perf_counter() - startTime
+        result['planReady']= planReady
+        result['expansions']= engine.planSteps
+    except Exception as e:
+        result['error']= str(e)
+    return result
+
+#### Batch ###################################################################
+
+#Plan all scenarios (iterable of Scenario) in maxWorkers processes
+#(default: number of CPUs) and yield the results of planScenario in the
+#order of completion. At most maxPending scenarios are submitted at once,
+#so the iterable may be a long generator. Maps which are not backed by a
+#map file are written to a temporary directory that is removed at the end.
+def planBatch(scenarios, maxWorkers=None, maxPending=None):
+    if maxWorkers is None:
+        maxWorkers= os.cpu_count() or 1
+    if maxPending is None:
+        maxPending= 4 * maxWorkers
+    tempDir= None
+    mapFiles= {}  #id of a GridMap -> (GridMap, file name)
+    pending= set()
+    try:
+        with cf.ProcessPoolExecutor(max_workers=maxWorkers) as executor:
+            try:
+                for index, scenario in enumerate(scenarios):
+                    if isinstance(scenario.gridMap, str):
+                        fileName= scenario.gridMap
+                    else:
+                        fileName= backingFile(scenario.gridMap)
+                        if fileName is None:
+                            entry= mapFiles.get(id(scenario.gridMap))
+                            if entry is None:
+                                if tempDir is None:
+                                    tempDir= tempfile.mkdtemp(prefix='batchPlanner')
+                                fileName= os.path.join(tempDir, str(len(mapFiles)) + '.dslm')
+                                mapFile.saveMap(scenario.gridMap, fileName)
+                                #The map is kept, so its id is not reused
+                                entry= (scenario.gridMap, fileName)
+                                mapFiles[id(scenario.gridMap)]= entry
+                            fileName= entry[1]
+                    pending.add(executor.submit(planScenario, index, fileName, scenario.task()))
+                    if len(pending) >= maxPending:
+                        done, pending= cf.wait(pending, return_when=cf.FIRST_COMPLETED)
+                        for future in done:
+                            yield future.result()
+                for future in cf.as_completed(pending):
+                    yield future.result()
+                pending= set()
+            finally:
+                #Cancel the queued scenarios before leaving the with block:
+                #the executor waits for all submitted scenarios on exit
+                for future in pending:
+                    future.cancel()
+    finally:
+        if tempDir is not None:
+            shutil.rmtree(tempDir, ignore_errors=True)
+
+#Return the map file of a GridMap loaded with mapFile.loadMap, None if the
+#map has been changed or is not memory-mapped. The file must contain
+#the map unchanged: copy on write changes are not in the file.
+def backingFile(gridMap):
+    obstacle= gridMap.obstacle
+    if getattr(obstacle, 'filename', None) is None or obstacle.mode != 'r+':
+        return None
+    if gridMap.cost is not None and getattr(gridMap.cost, 'filename', None) != obstacle.filename:
+        return None
+    obstacle.flush()
+    if gridMap.cost is not None:
+        gridMap.cost.flush()
+    return obstacle.filename
+
+#Read scenarios from JSON lines: {"map": file name, "start": [x, y],
+#"goal": [x, y], "name": ..., "backend": ..., "neighbors": 4 or 8,
+#"h0": bool, "algorithm": ..., "heuristic": ...}. Only map is required.
+def readScenarios(fileName):
+    with open(fileName) as f:
+        for line in f:
+            if line.strip():
+                entry= json.loads(line)
+                yield Scenario(entry['map'], entry.get('start'), entry.get('goal'),
+                               entry.get('name'), entry.get('backend', 'objects'),
+                               entry.get('h0', False), entry.get('neighbors', 8) == 4,
+                               entry.get('algorithm', 'Basic'), entry.get('heuristic'))
+
+#Scenarios of the benchmark maps (see planningBenchmark.py)
+def benchmarkScenarios(sizes, seeds):
+    from planningBenchmark import mapGenerators
+    for size in sizes:
+        for mapType, generator in sorted(mapGenerators.items()):
+            for seed in seeds:
+                aMap= generator(size, seed)
+                gridMap= mapFile.GridMap(size, size, start=aMap['start'], goal=aMap['goal'])
+                for x, y in aMap['obstacles']:
+                    gridMap.setObstacle(x, y)
+                yield Scenario(gridMap, name=mapType + '-' + str(size) + '-' + str(seed),
+                               heuristic='Octile')
+
+def parseArguments(argv):
+    parser= argparse.ArgumentParser(description='D* Lite batch planning')
+    parser.add_argument('--scenarios', default=None,
+                        help='JSON lines file of scenarios (default: benchmark maps)')
+    parser.add_argument('--sizes', default='64,128',
+                        help='comma separated sizes of the benchmark maps')
+    parser.add_argument('--seeds', default='1,2,3',
+                        help='comma separated seeds of the benchmark maps')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='worker processes (default: number of CPUs)')
+    parser.add_argument('--no-path', action='store_true', help='do not write the paths')
+    parser.add_argument('--output', default=None, help='append JSON lines to this file')
+    return parser.parse_args(argv)
+
+def main(argv):
+    args= parseArguments(argv)
+    if args.scenarios:
+        scenarios= readScenarios(args.scenarios)
+    else:
+        scenarios= benchmarkScenarios([int(s) for s in args.sizes.split(',')],
+                                      [int(s) for s in args.seeds.split(',')])
+    output= open(args.output, 'a') if args.output else sys.stdout
+    startTime= time.perf_counter()
+    count= 0
+    try:
+        for result in planBatch(scenarios, args.workers):
+            if args.no_path:
+                del result['path']
+            output.write(json.dumps(result) + '\n')
+            output.flush()
+            count+= 1
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    sys.stderr.write('%d scenarios in %.2f s\n' % (count, time.perf_counter() - startTime))
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
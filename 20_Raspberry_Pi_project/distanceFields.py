@@ -0,0 +1,247 @@
+#!/usr/bin/python3
+############################################################
+# Class DistanceField, FieldStore and the field tool
+# A distance field holds the costs from every cell of a
+# map to a fixed goal cell (backward Dijkstra with the edge
+# costs of D* Lite). For this map it is the final g-field
+# of D* Lite, so it is a perfect initialization: the
+# engines (DStarLiteEngine, ArrayDStarLite) seed g and rsh
+# from the field and only repair the cells whose obstacle
+# or terrain cost differs from the stored map.
+# The fields are computed with a NumPy wavefront: all
+# cells whose distance decreased relax their neighbors
+# together, one array operation per move, until no
+# distance decreases any more. The result equals Dijkstra
+# bit for bit, so it is consistent for the rsh-values of
+# the engines. The engines use it to bootstrap the first
+# search on the actual map (see useWavefront).
+#
+# Field file format (little endian):
+#   Header (32 bytes): magic "DSLF", version (uint16),
+#     flags (uint16, bit 0: 4 neighbors, bit 1: costs
+#     present), width, height (uint32), goalX, goalY
+#     (int32), 8 bytes reserved
+#   Obstacles of the map: width * height bytes
+#   Costs of the map (optional): width * height float64,
+#     8-byte aligned
+#   Distances: width * height float64 (inf: unreachable)
+# The arrays are opened with numpy.memmap.
+#
+# Usage example (precompute the fields of three stations):
+#   python3 distanceFields.py site.dslm --goals 10,5;80,40;3,77
+#           --neighbors 8 --output fields
+#
+# File: distanceFields.py
+# Version: 1.0    Date: 18.10.2026
+###########################################################
+
+import argparse
+import os
+import struct
+import sys
+import numpy as np
+import mapFile
+
+MAGIC= b'DSLF'
+VERSION= 1
+HEADER= struct.Struct('<4sHHIIii8x')
+FLAG_DIRECT= 1
+FLAG_COSTS= 2
+
+class DistanceField(object):
+
+    #obstacle and cost: flat arrays of the map the field was computed for
+    #(cost None: all costs are 1), g: flat array of the distances to goal
+    def __init__(self, width, height, goal, directNeighbors, obstacle, cost, g):
+        self.width= width
+        self.height= height
+        self.goal= goal
+        self.directNeighbors= directNeighbors
+        self.obstacle= obstacle
+        self.cost= cost
+        self.g= g
+
+    #True if the field fits a grid with this size, goal and connectivity
+    def matches(self, width, height, goal, directNeighbors):
+        return self.width == width and self.height == height and \
+               tuple(self.goal) == tuple(goal) and self.directNeighbors == directNeighbors
+
+    #Return the cell ids whose obstacle or cost differs from the given arrays
+    def changedCells(self, obstacle, cost):
+        changed= (np.asarray(obstacle) != 0) != (np.asarray(self.obstacle) != 0)
+        if cost is not None or self.cost is not None:
+            ownCost= self.cost if self.cost is not None else 1.0
+            otherCost= cost if cost is not None else 1.0
+            changed|= np.asarray(ownCost) != np.asarray(otherCost)
+        return np.flatnonzero(changed)
+
+
+#Calculate the costs from all cells to goal (x, y) with the edge costs of
+#the engines: straight 1, diagonal 1.4, times the mean terrain cost.
+#obstacle and cost are flat arrays (cost None: all costs are 1).
+#Return a flat array, inf for obstacles and unreachable cells.
+def wavefront(width, height, obstacle, cost, goal, directNeighbors=False):
+    size= width * height
+    obstacle= np.asarray(obstacle)
+    cost= np.ones(size) if cost is None else np.asarray(cost, dtype=np.float64)
+    g= np.full(size, float('inf'))
+    goalId= goal[0] * height + goal[1]
+    if obstacle[goalId]:
+        return g
+    if directNeighbors:
+        moves= ((-1, 0, 1), (1, 0, 1), (0, -1, 1), (0, 1, 1))
+    else:
+        moves= ((-1, -1, 1.4), (-1, 0, 1), (-1, 1, 1.4), (0, -1, 1),
+                (0, 1, 1), (1, -1, 1.4), (1, 0, 1), (1, 1, 1.4))
+    free= obstacle == 0
+    g[goalId]= 0.0
+    active= np.array([goalId]) #Cells whose distance decreased
+    while len(active):
+        if len(active) < SMALL_WAVE:
+            active= relaxCells(active, g, free, cost, width, height, moves)
+            continue
+        xs, ys= np.divmod(active, height)
+        changed= []
+        for dx, dy, distance in moves:
+            inside= (xs + dx >= 0) & (xs + dx < width) & (ys + dy >= 0) & (ys + dy < height)
+            u= active[inside]
+            n= u + (dx * height + dy)
+            reachable= free[n]
+            u= u[reachable]
+            n= n[reachable]
+            value= distance * (cost[u] + cost[n]) * 0.5 + g[u]
+            better= value < g[n]
+            n= n[better]
+            g[n]= value[better]
+            changed.append(n)
+        active= np.unique(np.concatenate(changed))
+    return g
+
+#Narrow waves (corridors, mazes) are relaxed cell by cell: the array
+#operations would cost more than they save
+SMALL_WAVE= 32
+
+#Relax the neighbors of the cells of active one by one.
+#Return the cells whose distance decreased.
+def relaxCells(active, g, free, cost, width, height, moves):
+    changed= set()
+    for u in active.tolist():
+        x, y= divmod(u, height)
+        gu= float(g[u])
+        costU= float(cost[u])
+        for dx, dy, distance in moves:
+            nx, ny= x + dx, y + dy
+            if 0 <= nx < width and 0 <= ny < height:
+                n= nx * height + ny
+                if free[n]:
+                    value= distance * (costU + float(cost[n])) * 0.5 + gu
+                    if value < g[n]:
+                        g[n]= value
+                        changed.add(n)
+    return np.array(sorted(changed), dtype=np.int64)
+
+#Calculate the distance field of goal (x, y) on a GridMap
+def computeField(gridMap, goal, directNeighbors=False):
+    g= wavefront(gridMap.width, gridMap.height, gridMap.obstacle, gridMap.cost, goal,
+                 directNeighbors)
+    return DistanceField(gridMap.width, gridMap.height, tuple(goal), directNeighbors,
+                         np.array(gridMap.obstacle, dtype=np.uint8),
+                         None if gridMap.cost is None else np.array(gridMap.cost, dtype=np.float64),
+                         g)
+
+#Offset of the costs in a field file with size cells
+def costOffset(size):
+    return (HEADER.size + size + 7) // 8 * 8
+
+#Save a DistanceField in the field file format
+def saveField(field, fileName):
+    size= field.width * field.height
+    flags= (FLAG_DIRECT if field.directNeighbors else 0) | \
+           (FLAG_COSTS if field.cost is not None else 0)
+    with open(fileName, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, flags, field.width, field.height,
+                            field.goal[0], field.goal[1]))
+        f.write(np.ascontiguousarray(field.obstacle, dtype=np.uint8).tobytes())
+        f.write(b'\0' * (costOffset(size) - HEADER.size - size))
+        if field.cost is not None:
+            f.write(np.ascontiguousarray(field.cost, dtype='<f8').tobytes())
+        f.write(np.ascontiguousarray(field.g, dtype='<f8').tobytes())
+
+#Load a field file. The arrays are memory-mapped read-only.
+def loadField(fileName):
+    with open(fileName, 'rb') as f:
+        header= f.read(HEADER.size)
+    if len(header) != HEADER.size:
+        raise Exception('Field file too short: ' + fileName)
+    magic, version, flags, width, height, gx, gy= HEADER.unpack(header)
+    if magic != MAGIC:
+        raise Exception('Not a distance field file: ' + fileName)
+    if version != VERSION:
+        raise Exception('Unsupported distance field version: ' + str(version))
+    size= width * height
+    obstacle= np.memmap(fileName, dtype=np.uint8, mode='r', offset=HEADER.size, shape=(size,))
+    offset= costOffset(size)
+    cost= None
+    if flags & FLAG_COSTS:
+        cost= np.memmap(fileName, dtype='<f8', mode='r', offset=offset, shape=(size,))
+        offset+= 8 * size
+    g= np.memmap(fileName, dtype='<f8', mode='r', offset=offset, shape=(size,))
+    return DistanceField(width, height, (gx, gy), bool(flags & FLAG_DIRECT), obstacle, cost, g)
+
+#Name of the field file of a goal in a FieldStore directory
+def fieldFileName(goal, directNeighbors):
+    return 'goal_%d_%d_%d.dslf' % (goal[0], goal[1], 4 if directNeighbors else 8)
+
+
+class FieldStore(object):
+
+    #The field files of a directory (see fieldFileName)
+    def __init__(self, directory):
+        self.directory= directory
+        self.fields= {} #file name -> DistanceField, loaded fields
+
+    #Return the field for a grid with this size, goal and connectivity or None
+    def find(self, width, height, goal, directNeighbors):
+        name= fieldFileName(goal, directNeighbors)
+        field= self.fields.get(name)
+        if field is None:
+            fileName= os.path.join(self.directory, name)
+            if not os.path.exists(fileName):
+                return None
+            field= loadField(fileName)
+            self.fields[name]= field
+        return field if field.matches(width, height, goal, directNeighbors) else None
+
+    #Compute and save the field of a goal on a GridMap
+    def add(self, gridMap, goal, directNeighbors=False):
+        os.makedirs(self.directory, exist_ok=True)
+        field= computeField(gridMap, goal, directNeighbors)
+        name= fieldFileName(goal, directNeighbors)
+        self.fields.pop(name, None)
+        saveField(field, os.path.join(self.directory, name))
+        return field
+
+
+def parseArguments(argv):
+    parser= argparse.ArgumentParser(description='Precompute distance fields of goal cells')
+    parser.add_argument('map', help='map file (see mapFile.py)')
+    parser.add_argument('--goals', required=True,
+                        help='goal cells x,y separated by semicolons')
+    parser.add_argument('--neighbors', type=int, choices=(4, 8), default=8)
+    parser.add_argument('--output', default='fields', help='directory of the field files')
+    return parser.parse_args(argv)
+
+def main(argv):
+    args= parseArguments(argv)
+    gridMap= mapFile.loadMap(args.map)
+    store= FieldStore(args.output)
+    for goal in args.goals.split(';'):
+        x, y= [int(c) for c in goal.split(',')]
+        field= store.add(gridMap, (x, y), args.neighbors == 4)
+        reachable= np.isfinite(field.g)
+        print('Goal', (x, y), 'reachable cells:', int(reachable.sum()),
+              'max. distance:', round(float(field.g[reachable].max()), 1),
+              'file:', os.path.join(args.output, fieldFileName((x, y), args.neighbors == 4)))
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
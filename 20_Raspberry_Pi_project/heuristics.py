@@ -0,0 +1,223 @@
+#!/usr/bin/python3
+############################################################
+# Heuristics for DStarLiteEngine
+# A heuristic estimates the costs between a vertex and the
+# start vertex. It must never overestimate them and must be
+# consistent with the edge costs of the engine (straight
+# move 1, diagonal move 1.4, times the terrain factors >= 1).
+# Available heuristics (see heuristicTypes):
+#   Zero:            no heuristic (Dijkstra like search)
+#   Manhattan:       exact for 4 neighbors without obstacles
+#                    (overestimates diagonal moves, so it
+#                    is only allowed with 4 neighbors)
+#   Octile:          exact costs 1 / 1.4 for 8 neighbors
+#                    (Manhattan for 4 neighbors)
+#   Landmarks (ALT): A*, landmarks and triangle inequality:
+#                    distance fields of some landmarks are
+#                    computed with Dijkstra before planning,
+#                    the maximum of octile and all landmark
+#                    bounds is used.
+# MultiStartHeuristic is the minimum of a heuristic for
+# several start vertices (several robots with one goal).
+# Landmark distances stay valid if edge costs increase. If
+# costs decrease (freed obstacles, lower terrain costs) the
+# engine creates a new heuristic (see dependsOnMap).
+# EuclideanHeuristic is not available for planning: it
+# overestimates diagonal moves of cost 1.4 (sqrt(2) > 1.4).
+#
+# File: heuristics.py
+# Version: 1.0    Date: 18.10.2026
+###########################################################
+
+import heapq
+import math
+
+INF= float('inf')
+
+class Heuristic(object):
+
+    #True if the heuristic has to be recreated when edge costs decrease
+    dependsOnMap= False
+
+    #Prepare the heuristic for planning with engine (DStarLiteEngine)
+    def prepare(self, engine):
+        self.directNeighbors= engine.directNeighbors
+
+    #Return the heuristic value of aVertex for the start vertex startNode
+    def h(self, aVertex, startNode):
+        raise Exception('Heuristic.h is not implemented')
+
+
+class ZeroHeuristic(Heuristic):
+
+    def h(self, aVertex, startNode):
+        return 0
+
+
+class ManhattanHeuristic(Heuristic):
+
+    def prepare(self, engine):
+        if not engine.directNeighbors:
+            raise Exception('Manhattan heuristic overestimates diagonal moves: use 4 neighbors')
+        Heuristic.prepare(self, engine)
+
+    def h(self, aVertex, startNode):
+        return abs(aVertex.x - startNode.x) + abs(aVertex.y - startNode.y)
+
+
+#Overestimates diagonal moves (sqrt(2) > 1.4), so the search can stop
+#before the start vertex is consistent. Only used by the benchmarks of
+#the key calculation (see vertexBenchmark.py), not in heuristicTypes.
+class EuclideanHeuristic(Heuristic):
+
+    def h(self, aVertex, startNode):
+        dx= aVertex.x - startNode.x
+        dy= aVertex.y - startNode.y
+        return math.sqrt(dx * dx + dy * dy)
+
+
+class OctileHeuristic(Heuristic):
+
+    def h(self, aVertex, startNode):
+        dx= abs(aVertex.x - startNode.x)
+        dy= abs(aVertex.y - startNode.y)
+        if self.directNeighbors:
+            return dx + dy
+        if dx > dy:
+            return dx + 0.4 * dy
+        return dy + 0.4 * dx
+
+
+class LandmarkHeuristic(OctileHeuristic):
+
+    dependsOnMap= True
+
+    #Number of landmarks
+    def __init__(self, landmarkCount=4):
+        self.landmarkCount= landmarkCount
+
+    #Select the landmarks and calculate their distance fields
+    def prepare(self, engine):
+        OctileHeuristic.prepare(self, engine)
+        self.landmarks= []
+        self.fields= []
+        self.start= None
+        self.startValues= []
+        #Landmarks far away from each other: the next landmark is the vertex
+        #with the largest distance to the goal and all chosen landmarks
+        nearest= self.distanceField(engine, engine.goalNode)
+        for i in range(self.landmarkCount):
+            best= None
+            bestDistance= 0
+            for x, column in enumerate(nearest):
+                for y, distance in enumerate(column):
+                    if bestDistance < distance < INF:
+                        best= (x, y)
+                        bestDistance= distance
+            if best is None:
+                break
+            field= self.distanceField(engine, engine.vertexGrid[best[0]][best[1]])
+            self.landmarks.append(best)
+            self.fields.append(field)
+            nearest= [[min(a, b) for a, b in zip(column, fieldColumn)]
+                      for column, fieldColumn in zip(nearest, field)]
+
+    #Return the costs from source to all vertices (Dijkstra with the
+    #edge costs of the engine), inf for obstacles and unreachable vertices
+    def distanceField(self, engine, source):
+        grid= engine.vertexGrid
+        adjacency= engine.adjacency
+        field= [[INF] * engine.height for x in range(engine.width)]
+        if source.isObstacle:
+            return field
+        field[source.x][source.y]= 0.0
+        heap= [(0.0, source.x, source.y)]
+        while heap:
+            distance, x, y= heapq.heappop(heap)
+            if distance > field[x][y]:
+                continue
+            aCost= grid[x][y].cost
+            for n, cost in adjacency[x][y]:
+                if not n.isObstacle:
+                    value= distance + cost * (aCost + n.cost) * 0.5
+                    if value < field[n.x][n.y]:
+                        field[n.x][n.y]= value
+                        heapq.heappush(heap, (value, n.x, n.y))
+        return field
+
+    #Maximum of octile distance and |d(L, v) - d(L, start)| for all
+    #landmarks L which reach both vertices
+    def h(self, aVertex, startNode):
+        if startNode is not self.start:
+            self.start= startNode
+            self.startValues= [(field, field[startNode.x][startNode.y]) for field in self.fields
+                               if field[startNode.x][startNode.y] < INF]
+        value= OctileHeuristic.h(self, aVertex, startNode)
+        x= aVertex.x
+        y= aVertex.y
+        for field, startValue in self.startValues:
+            distance= field[x][y]
+            if distance < INF:
+                bound= distance - startValue if distance > startValue else startValue - distance
+                if bound > value:
+                    value= bound
+        return value
+
+
+class MultiStartHeuristic(Heuristic):
+
+    #Minimum of the prepared heuristic base for all startNodes. It is
+    #consistent if base is consistent. The argument startNode of h is
+    #ignored, so the keys are the same for all robots. The values are
+    #cached per vertex: create a new object when a robot moves.
+    def __init__(self, base, startNodes):
+        self.base= base
+        self.startNodes= list(startNodes)
+        self.dependsOnMap= base.dependsOnMap
+        self.values= {}
+
+    def h(self, aVertex, startNode):
+        value= self.values.get(aVertex)
+        if value is None:
+            h= self.base.h
+            value= min(h(aVertex, node) for node in self.startNodes)
+            self.values[aVertex]= value
+        return value
+
+
+#Available heuristics for the planner
+heuristicTypes= {'Zero': ZeroHeuristic,
+                 'Manhattan': ManhattanHeuristic,
+                 'Octile': OctileHeuristic,
+                 'Landmarks (ALT)': LandmarkHeuristic}
+
+#Create a new heuristic of the given type
+def createHeuristic(heuristicType):
+    if heuristicType not in heuristicTypes:
+        raise Exception('Unknown heuristic: ' + str(heuristicType))
+    return heuristicTypes[heuristicType]()
+
+if __name__ == "__main__":
+    #Compare the expansions of the heuristics on the benchmark maps
+    import contextlib
+    import os
+    import time
+    from DStarLiteEngine import DStarLiteEngine
+    from planningBenchmark import mapGenerators
+    for mapType in ('random', 'rooms', 'maze'):
+        aMap= mapGenerators[mapType](100, 1)
+        for name in heuristicTypes:
+            if name == 'Manhattan':
+                continue #Only for 4 neighbors
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                engine= DStarLiteEngine(aMap['width'], aMap['height'], hIsZero=False,
+                                        directNeighbors=False, heuristic=name)
+                for x, y in aMap['obstacles']:
+                    engine.setObstacle(x, y)
+                engine.setStartCoordinates(*aMap['start'])
+                engine.setGoalCoordinates(*aMap['goal'])
+                startTime= time.perf_counter()
+                engine.plan()
+            print('%-6s %-16s expansions: %6d  time: %.3f s  cost: %.1f'
+                  % (mapType, name, engine.planSteps, time.perf_counter() - startTime,
+                     engine.startNode.g))
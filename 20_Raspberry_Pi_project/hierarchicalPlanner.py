@@ -0,0 +1,454 @@
+#!/usr/bin/python3
+############################################################
+# Class HierarchicalPlanner
+# Hierarchical planning for large grids. The grid is divided
+# into square clusters. A coarse ArrayDStarLite plans on the
+# grid of clusters: a cluster is an obstacle if it has no
+# free cell, a move between two clusters is closed (bit of
+# the coarse neighbor mask cleared) if no free cell of one
+# cluster has a free neighbor cell in the other cluster.
+# Then only a corridor of clusters along the abstract path
+# is refined with an ArrayDStarLite on the full resolution.
+# The refinement is done for a window of clusters at once,
+# the rest of the path is refined on demand (completePath).
+# A cluster split by a wall may be connected on the coarse
+# grid although the robot cannot cross it: a breadth first
+# search in the window finds such a move, it is closed and
+# the coarse grid is replanned.
+#
+# The coarse planner is goal-rooted, so changed cells only
+# update their own cluster and the moves to its neighbors,
+# followed by an incremental replanning of the coarse grid.
+#
+# File: hierarchicalPlanner.py
+# Version: 1.0    Date: 18.10.2026
+###########################################################
+
+import time
+import numpy as np
+from arrayDStarLite import ArrayDStarLite
+from arrayGrid import ALL_MOVES, DIRECT_MOVES
+from planMetrics import PlanMetrics
+
+class HierarchicalPlanner(object):
+
+    #Create a new planner for a grid of gridWidth x gridHeight cells.
+    #clusterSize is the side length of a cluster in cells, window the
+    #number of clusters of the abstract path which are refined at once.
+    def __init__(self, gridWidth=5, gridHeight=4, hIsZero=False, directNeighbors=False,
+                 clusterSize=32, window=2, metrics=None):
+        if window < 2:
+            raise Exception('The refinement window needs at least 2 clusters')
+        self.width= gridWidth
+        self.height= gridHeight
+        self.hIsZero= hIsZero
+        self.directNeighbors= directNeighbors # false=8, true=4
+        self.clusterSize= clusterSize
+        self.window= window
+        self.metrics= metrics if metrics is not None else PlanMetrics()
+        self.obstacle= np.zeros(gridWidth * gridHeight, dtype=np.uint8)
+        self.cost= None   #Terrain cost factors, None: all costs are 1
+        self.start= None  #(x, y) of the actual robot position
+        self.goal= None   #(x, y)
+        self.coarse= None #ArrayDStarLite on the grid of clusters
+        self.planSteps= 0
+        self.planReady= False
+        self.actualPath= []    #Refined path as (x, y) tuples
+        self.abstractPath= []  #Cluster coordinates (cx, cy) from start to goal
+
+    #### Functions for the design of the grid ##################################################
+
+    def setStartCoordinates(self, x=0, y=0):
+        self.start= (int(x), int(y))
+
+    def getStartCoordinates(self):
+        return list(self.start)
+
+    def setGoalCoordinates(self, x=0, y=0):
+        self.goal= (int(x), int(y))
+
+    def getGoalCoordinates(self):
+        return list(self.goal)
+
+    def setObstacle(self, x, y, isObstacle=True):
+        self.obstacle[int(x) * self.height + int(y)]= 1 if isObstacle else 0
+
+    def setCost(self, x, y, cost):
+        if not 1 <= cost < float('inf'):
+            raise Exception('Terrain cost must be >= 1 and finite: ' + str(cost))
+        if self.cost is None:
+            self.cost= np.ones(self.width * self.height)
+        self.cost[int(x) * self.height + int(y)]= cost
+
+    #Use start, goal, obstacles and costs of a GridMap (see mapFile.py).
+    #The arrays of the map are used without copying them.
+    def applyMap(self, gridMap):
+        if gridMap.width != self.width or gridMap.height != self.height:
+            raise Exception('Map size ' + str(gridMap.width) + 'x' + str(gridMap.height) +
+                            ' does not match the grid')
+        self.obstacle= gridMap.obstacle
+        self.cost= gridMap.cost
+        if gridMap.start is not None:
+            self.setStartCoordinates(*gridMap.start)
+        if gridMap.goal is not None:
+            self.setGoalCoordinates(*gridMap.goal)
+
+    def isFree(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height and \
+               not self.obstacle[x * self.height + y]
+
+    def clusterOf(self, x, y):
+        return (x // self.clusterSize, y // self.clusterSize)
+
+    #### Abstract graph ##################################################################
+
+    #Build the coarse planner for the actual obstacles and costs
+    def buildAbstraction(self):
+        size= self.clusterSize
+        self.clustersX= -(-self.width // size)
+        self.clustersY= -(-self.height // size)
+        #Free cells and costs padded to whole clusters
+        self.free= np.zeros((self.clustersX * size, self.clustersY * size), dtype=bool)
+        self.free[:self.width, :self.height]= np.asarray(self.obstacle).reshape(
+            self.width, self.height) == 0
+        self.paddedCost= None
+        if self.cost is not None:
+            self.paddedCost= np.ones(self.free.shape)
+            self.paddedCost[:self.width, :self.height]= np.asarray(self.cost).reshape(
+                self.width, self.height)
+        self.coarse= ArrayDStarLite(self.clustersX, self.clustersY, self.hIsZero,
+                                   self.directNeighbors, metrics=self.metrics)
+        self.coarseMask= np.zeros(self.clustersX * self.clustersY, dtype=np.uint8)
+        self.coarse.grid.setNeighborMask(self.directNeighbors, self.coarseMask)
+        self.updateClusters(0, 0, self.clustersX, self.clustersY)
+
+    #Calculate obstacle, cost and neighbor mask of the clusters
+    #cx0 <= cx < cx1, cy0 <= cy < cy1 of the coarse grid
+    def updateClusters(self, cx0, cy0, cx1, cy1):
+        size= self.clusterSize
+        #Block of clusters with a border of one cluster for the moves
+        hx0, hy0= max(cx0 - 1, 0), max(cy0 - 1, 0)
+        hx1, hy1= min(cx1 + 1, self.clustersX), min(cy1 + 1, self.clustersY)
+        nx, ny= hx1 - hx0, hy1 - hy0
+        free= self.free[hx0 * size:hx1 * size, hy0 * size:hy1 * size]
+        blocks= free.reshape(nx, size, ny, size)
+        freeCount= blocks.sum(axis=(1, 3))
+        if self.paddedCost is not None:
+            costs= self.paddedCost[hx0 * size:hx1 * size, hy0 * size:hy1 * size]
+            costSum= (costs * free).reshape(nx, size, ny, size).sum(axis=(1, 3))
+            meanCost= np.where(freeCount > 0, costSum / np.maximum(freeCount, 1), 1.0)
+        else:
+            meanCost= np.ones((nx, ny))
+        #Open moves between neighbor clusters along x and y
+        openX= self.openBorders(free[size - 1::size, :], free[0::size, :])
+        openY= self.openBorders(free[:, size - 1::size].T, free[:, 0::size].T).T
+        #Diagonal moves only through the corner cells
+        upRight= free[size - 1::size, size - 1::size][:-1, :-1] & free[0::size, 0::size][1:, 1:]
+        downRight= free[size - 1::size, 0::size][:-1, 1:] & free[0::size, size - 1::size][1:, :-1]
+        opens= {}
+        opens[(1, 0)]= self.shifted(openX, 0, 0, nx, ny)
+        opens[(-1, 0)]= self.shifted(openX, 1, 0, nx, ny)
+        opens[(0, 1)]= self.shifted(openY, 0, 0, nx, ny)
+        opens[(0, -1)]= self.shifted(openY, 0, 1, nx, ny)
+        opens[(1, 1)]= self.shifted(upRight, 0, 0, nx, ny)
+        opens[(-1, -1)]= self.shifted(upRight, 1, 1, nx, ny)
+        opens[(1, -1)]= self.shifted(downRight, 0, 1, nx, ny)
+        opens[(-1, 1)]= self.shifted(downRight, 1, 0, nx, ny)
+        moves= DIRECT_MOVES if self.directNeighbors else ALL_MOVES
+        mask= np.zeros((nx, ny), dtype=np.uint8)
+        for bit, (dx, dy, cost) in enumerate(moves):
+            mask|= opens[(dx, dy)].astype(np.uint8) << bit
+        #Copy the inner clusters into the coarse planner
+        ix0, iy0= cx0 - hx0, cy0 - hy0
+        ix1, iy1= ix0 + cx1 - cx0, iy0 + cy1 - cy0
+        grid= self.coarse.grid
+        shape= (self.clustersX, self.clustersY)
+        grid.obstacle.reshape(shape)[cx0:cx1, cy0:cy1]= freeCount[ix0:ix1, iy0:iy1] == 0
+        grid.cost.reshape(shape)[cx0:cx1, cy0:cy1]= meanCost[ix0:ix1, iy0:iy1]
+        self.coarseMask.reshape(shape)[cx0:cx1, cy0:cy1]= mask[ix0:ix1, iy0:iy1]
+
+    #Return for every pair of neighbor clusters if a free cell of the
+    #last line of the first cluster has a free neighbor in the first line
+    #of the second cluster. last and first have one row per cluster.
+    #With only one cluster along the rows the result has no rows.
+    def openBorders(self, last, first):
+        size= self.clusterSize
+        a, b= last[:-1], first[1:]
+        pairs= a & b
+        if not self.directNeighbors:
+            #Diagonal steps over the border inside of the same row of clusters
+            sameRow= (np.arange(a.shape[1] - 1) % size) != size - 1
+            pairs[:, :-1]|= a[:, :-1] & b[:, 1:] & sameRow
+            pairs[:, 1:]|= a[:, 1:] & b[:, :-1] & sameRow
+        return pairs.reshape(pairs.shape[0], pairs.shape[1] // size, size).any(axis=2)
+
+    #Place an array of moves between pairs of clusters into an array
+    #with one entry per source cluster (nx, ny). The move of the pair
+    #(i, j) starts at cluster (i + dx, j + dy).
+    def shifted(self, pairs, dx, dy, nx, ny):
+        result= np.zeros((nx, ny), dtype=bool)
+        px, py= pairs.shape
+        result[dx:dx + px, dy:dy + py]= pairs
+        return result
+
+    #### Planning ########################################################################
+
+    #Plan on the coarse grid and refine the first window of the
+    #abstract path. Return True if a plan exists.
+    def plan(self):
+        startTime= time.time()
+        with self.metrics.phase('buildAbstraction'):
+            self.buildAbstraction()
+        self.coarse.setStartCoordinates(*self.clusterOf(*self.start))
+        self.coarse.setGoalCoordinates(*self.clusterOf(*self.goal))
+        self.coarse.plan()
+        self.planSteps= self.coarse.planSteps
+        self.actualPath= []
+        self.planReady= self.refine(self.start)
+        self.planTime= time.time() - startTime
+        self.metrics.event('plan', seconds=self.planTime, steps=self.planSteps,
+                           planReady=self.planReady)
+        return self.planReady
+
+    #Return the abstract path from the cluster of cell x,y to the goal
+    #cluster. The next cluster is the neighbor s with the smallest
+    #cost(u, s) + g(s) in the coarse planner.
+    def abstractPathFrom(self, x, y):
+        coarse= self.coarse
+        grid= coarse.grid
+        cellId= grid.cellId(*self.clusterOf(x, y))
+        path= [cellId]
+        while cellId != coarse.goal:
+            best= None
+            bestValue= float('inf')
+            mask= coarse.mask[cellId]
+            for bit, offset, distance in coarse.moves:
+                s= cellId + offset
+                if mask & bit and not grid.obstacle[s]:
+                    value= distance * (grid.cost[cellId] + grid.cost[s]) * 0.5 + grid.g[s]
+                    if value < bestValue:
+                        best, bestValue= s, value
+            if best is None or len(path) > grid.size:
+                return None
+            cellId= best
+            path.append(cellId)
+        return [grid.coordinates(c) for c in path]
+
+    #Refine the next window of the abstract path from cell x,y and
+    #append it to actualPath. Return False if no path exists.
+    def refine(self, start):
+        with self.metrics.phase('refine'):
+            segment= None
+            #A cluster may not be connected inside (e.g. split by a wall).
+            #Then the move which cannot be used from start is closed and
+            #the coarse grid is replanned.
+            for closures in range(self.clustersX * self.clustersY):
+                self.abstractPath= self.abstractPathFrom(*start)
+                if self.abstractPath is None:
+                    break
+                clusters= self.abstractPath[:self.window]
+                reached= self.reachableCells(start, clusters)
+                reachedClusters= set(self.clusterOf(x, y) for x, y in reached)
+                missing= [i for i, c in enumerate(clusters) if c not in reachedClusters]
+                if missing:
+                    self.closeMove(start, clusters[missing[0] - 1], clusters[missing[0]])
+                    continue
+                if len(clusters) == len(self.abstractPath):
+                    target= self.goal if self.goal in reached else None
+                    blockedMove= clusters[-2:]
+                else:
+                    nextCluster= self.abstractPath[len(clusters)]
+                    target= self.entrance(clusters[-1], nextCluster, reached)
+                    blockedMove= (clusters[-1], nextCluster)
+                if target is not None:
+                    segment= self.refineCorridor(start, target, clusters)
+                    break
+                if len(blockedMove) < 2:
+                    break
+                self.closeMove(start, *blockedMove)
+            if segment is None:
+                #The abstraction found no way: plan on the whole grid
+                segment= self.refineCorridor(start, self.goal, None)
+            if segment is None:
+                return False
+            if self.actualPath:
+                segment= segment[1:]
+            self.actualPath.extend(segment)
+            return True
+
+    #Refine all remaining windows up to the goal. Return if a path exists.
+    def completePath(self):
+        while self.planReady and self.actualPath[-1] != self.goal:
+            self.planReady= self.refine(self.actualPath[-1])
+        return self.planReady
+
+    #Return the free cells of the given clusters which can be reached
+    #from start without leaving the clusters (breadth first search)
+    def reachableCells(self, start, clusters):
+        clusters= set(clusters)
+        moves= DIRECT_MOVES if self.directNeighbors else ALL_MOVES
+        reached= {start}
+        front= [start]
+        while front:
+            nextFront= []
+            for x, y in front:
+                for dx, dy, cost in moves:
+                    cell= (x + dx, y + dy)
+                    if cell not in reached and self.isFree(*cell) and \
+                       self.clusterOf(*cell) in clusters:
+                        reached.add(cell)
+                        nextFront.append(cell)
+            front= nextFront
+        return reached
+
+    #Close the moves between the neighbor clusters a and b and
+    #replan the coarse grid from the cluster of cell start
+    def closeMove(self, start, a, b):
+        moves= DIRECT_MOVES if self.directNeighbors else ALL_MOVES
+        grid= self.coarse.grid
+        for (fx, fy), (tx, ty) in ((a, b), (b, a)):
+            for bit, (dx, dy, cost) in enumerate(moves):
+                if (fx + dx, fy + dy) == (tx, ty):
+                    self.coarseMask[grid.cellId(fx, fy)]&= ~(1 << bit) & 0xff
+        self.coarse.start= grid.cellId(*self.clusterOf(*start))
+        self.coarse.applyChanges(recompute=(grid.cellId(*a), grid.cellId(*b)))
+        self.planSteps+= self.coarse.planSteps
+
+    #Return a free cell of cluster a which has a free neighbor in cluster b
+    #and is one of the reached cells (None if there is no such cell)
+    def entrance(self, a, b, reached):
+        size= self.clusterSize
+        dx, dy= b[0] - a[0], b[1] - a[1]
+        xs= range(a[0] * size, min((a[0] + 1) * size, self.width))
+        ys= range(a[1] * size, min((a[1] + 1) * size, self.height))
+        if dx != 0:
+            xs= [xs[-1] if dx > 0 else xs[0]]
+        if dy != 0:
+            ys= [ys[-1] if dy > 0 else ys[0]]
+        moves= DIRECT_MOVES if self.directNeighbors else ALL_MOVES
+        candidates= [(x, y) for x in xs for y in ys if (x, y) in reached and
+                     any(self.isFree(x + mx, y + my) and self.clusterOf(x + mx, y + my) == b
+                         for mx, my, cost in moves)]
+        if not candidates:
+            return None
+        return candidates[len(candidates) // 2]
+
+    #Plan from start to target with an ArrayDStarLite on the bounding box
+    #of the given clusters (None: the whole grid). Cells outside of the
+    #clusters are obstacles. Return the path as (x, y) tuples or None.
+    def refineCorridor(self, start, target, clusters):
+        size= self.clusterSize
+        if clusters is None:
+            x0, y0, x1, y1= 0, 0, self.width, self.height
+        else:
+            clusters= [(cx, cy) for cx, cy in clusters
+                       if 0 <= cx < self.clustersX and 0 <= cy < self.clustersY]
+            x0= min(cx for cx, cy in clusters) * size
+            y0= min(cy for cx, cy in clusters) * size
+            x1= min((max(cx for cx, cy in clusters) + 1) * size, self.width)
+            y1= min((max(cy for cx, cy in clusters) + 1) * size, self.height)
+        width, height= x1 - x0, y1 - y0
+        blocked= ~self.free[x0:x1, y0:y1]
+        if clusters is not None:
+            outside= np.ones((width, height), dtype=bool)
+            for cx, cy in clusters:
+                outside[cx * size - x0:(cx + 1) * size - x0, cy * size - y0:(cy + 1) * size - y0]= False
+            blocked|= outside
+        planner= ArrayDStarLite(width, height, self.hIsZero, self.directNeighbors,
+                               metrics=self.metrics)
+        cost= None
+        if self.paddedCost is not None:
+            cost= np.ascontiguousarray(self.paddedCost[x0:x1, y0:y1]).ravel()
+        planner.grid.useArrays(blocked.astype(np.uint8).ravel(), cost)
+        planner.setStartCoordinates(start[0] - x0, start[1] - y0)
+        planner.setGoalCoordinates(target[0] - x0, target[1] - y0)
+        planner.plan()
+        self.planSteps+= planner.planSteps
+        if not planner.planReady:
+            return None
+        return [(x + x0, y + y0) for x, y in planner.pathCoordinates()]
+
+    #Return the actual path as list of [x, y] coordinates
+    def pathCoordinates(self):
+        return [list(cell) for cell in self.actualPath]
+
+    #Return the cost of the actual path
+    def pathCost(self):
+        total= 0.0
+        for (x, y), (nx, ny) in zip(self.actualPath, self.actualPath[1:]):
+            distance= 1 if x == nx or y == ny else 1.4
+            if self.cost is None:
+                total+= distance
+            else:
+                total+= distance * (self.cost[x * self.height + y] +
+                                    self.cost[nx * self.height + ny]) * 0.5
+        return total
+
+    #### Replanning ######################################################################
+
+    # A new obstacle at x,y has been found after the robot moved to
+    # self.start. Replan the path to goal. Return if a plan exists.
+    def replanning(self, x, y):
+        return self.applyChanges(blocked=((x, y),))
+
+    # Several cells changed (lists of (x, y) and (x, y, cost)). Only the
+    # clusters of the changed cells and the moves to their neighbors are
+    # updated, then the coarse grid is replanned incrementally and the
+    # first window is refined again. Return if a plan exists.
+    def applyChanges(self, blocked=(), freed=(), costs=()):
+        self.metrics.count('replans')
+        with self.metrics.phase('replanning'):
+            changed= set()
+            for x, y in blocked:
+                self.setObstacle(x, y)
+                self.free[x, y]= False
+                changed.add(self.clusterOf(x, y))
+            for x, y in freed:
+                self.setObstacle(x, y, False)
+                self.free[x, y]= True
+                changed.add(self.clusterOf(x, y))
+            for x, y, cost in costs:
+                self.setCost(x, y, cost)
+                if self.paddedCost is None:
+                    self.paddedCost= np.ones(self.free.shape)
+                self.paddedCost[x, y]= cost
+                changed.add(self.clusterOf(x, y))
+            #The cluster and the moves of its neighbors change
+            recompute= set()
+            for cx, cy in changed:
+                self.updateClusters(max(cx - 1, 0), max(cy - 1, 0),
+                                    min(cx + 2, self.clustersX), min(cy + 2, self.clustersY))
+                for nx in range(max(cx - 1, 0), min(cx + 2, self.clustersX)):
+                    for ny in range(max(cy - 1, 0), min(cy + 2, self.clustersY)):
+                        recompute.add(self.coarse.grid.cellId(nx, ny))
+            self.coarse.start= self.coarse.grid.cellId(*self.clusterOf(*self.start))
+            self.coarse.applyChanges(recompute=recompute)
+            self.planSteps= self.coarse.planSteps
+            self.actualPath= []
+            self.planReady= self.refine(self.start)
+        return self.planReady
+
+if __name__ == "__main__":
+    import mapFile
+    size= 2000
+    gridMap= mapFile.GridMap(size, size, start=(0, 0), goal=(size - 1, size - 1))
+    rnd= np.random.RandomState(1)
+    gridMap.obstacle[:]= rnd.random_sample(size * size) < 0.2
+    gridMap.obstacle.reshape(size, size)[size // 2, :size - 100]= 1
+    gridMap.obstacle[0]= gridMap.obstacle[-1]= 0
+    planner= HierarchicalPlanner(size, size, hIsZero=False, directNeighbors=False)
+    planner.applyMap(gridMap)
+    planner.plan()
+    print('First plan:', round(planner.planTime, 3), 's', 'steps:', planner.planSteps,
+          'path cells:', len(planner.actualPath), 'clusters:', len(planner.abstractPath))
+    startTime= time.time()
+    planner.completePath()
+    print('Complete path:', round(time.time() - startTime, 3), 's', 'cells:',
+          len(planner.actualPath), 'cost:', round(planner.pathCost(), 1))
+    #A corridor map only one cluster high
+    corridor= HierarchicalPlanner(100, 20)
+    corridor.setStartCoordinates(0, 0)
+    corridor.setGoalCoordinates(99, 19)
+    corridor.plan()
+    corridor.completePath()
+    print('Corridor 100x20:', corridor.planReady, 'cost:', round(corridor.pathCost(), 1))
@@ -0,0 +1,198 @@
+#!/usr/bin/python3
+############################################################
+# Class GridMap and map files
+# A GridMap holds the design of a planning grid: size,
+# start, goal, obstacles and optional terrain costs.
+# Obstacles and costs are NumPy arrays indexed by the
+# flat cell id of ArrayGrid: id = x * height + y.
+#
+# Map file format (little endian):
+#   Header (32 bytes): magic "DSLM", version (uint16),
+#     flags (uint16, bit 0: costs present), width, height
+#     (uint32), startX, startY, goalX, goalY (int32, -1 if
+#     not set)
+#   Obstacles: width * height bytes (0 = free, 1 = obstacle)
+#   Costs (optional): width * height float64, 8-byte aligned
+# loadMap opens the arrays with numpy.memmap, so a large
+# map is not read or copied into Python objects.
+#
+# importImage reads an occupancy image (PGM or PNG):
+# dark pixels are obstacles, the top row of the image is
+# the highest y-coordinate like in DStarLiteView.
+#
+# File: mapFile.py
+# Version: 1.0    Date: 18.10.2026
+###########################################################
+
+import struct
+import numpy as np
+
+MAGIC= b'DSLM'
+VERSION= 1
+HEADER= struct.Struct('<4sHHIIiiii')
+FLAG_COSTS= 1
+
+class GridMap(object):
+
+    #Create an empty map. obstacle and cost are flat arrays of
+    #width * height cells, cost may be None (all costs are 1).
+    def __init__(self, width, height, obstacle=None, cost=None, start=None, goal=None):
+        self.width= width
+        self.height= height
+        if obstacle is None:
+            obstacle= np.zeros(width * height, dtype=np.uint8)
+        if len(obstacle) != width * height or (cost is not None and len(cost) != width * height):
+            raise Exception('GridMap: arrays do not match the size ' + str(width) + 'x' + str(height))
+        self.obstacle= obstacle
+        self.cost= cost
+        self.start= start  #(x, y) or None
+        self.goal= goal    #(x, y) or None
+
+    #Return the coordinates (x, y) of all obstacles
+    def obstacleCoordinates(self):
+        return [divmod(int(i), self.height) for i in np.flatnonzero(self.obstacle)]
+
+    #Return (x, y, cost) of all cells with a cost other than 1
+    def costEntries(self):
+        if self.cost is None:
+            return []
+        return [divmod(int(i), self.height) + (float(self.cost[i]),)
+                for i in np.flatnonzero(self.cost != 1)]
+
+    def setObstacle(self, x, y, isObstacle=True):
+        self.obstacle[x * self.height + y]= 1 if isObstacle else 0
+
+    def setCost(self, x, y, cost):
+        if self.cost is None:
+            self.cost= np.ones(self.width * self.height)
+        self.cost[x * self.height + y]= cost
+
+
+#Save a GridMap in the binary map format
+def saveMap(gridMap, fileName):
+    flags= FLAG_COSTS if gridMap.cost is not None else 0
+    start= gridMap.start if gridMap.start is not None else (-1, -1)
+    goal= gridMap.goal if gridMap.goal is not None else (-1, -1)
+    size= gridMap.width * gridMap.height
+    with open(fileName, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, flags, gridMap.width, gridMap.height,
+                            start[0], start[1], goal[0], goal[1]))
+        f.write(np.ascontiguousarray(gridMap.obstacle, dtype=np.uint8).tobytes())
+        if flags & FLAG_COSTS:
+            f.write(b'\0' * (costOffset(size) - HEADER.size - size))
+            f.write(np.ascontiguousarray(gridMap.cost, dtype='<f8').tobytes())
+
+#Offset of the costs in a map file with size cells
+def costOffset(size):
+    return (HEADER.size + size + 7) // 8 * 8
+
+#Load a map file. The arrays are memory-mapped: with writable=False
+#changes of the map stay in memory (copy on write), with writable=True
+#they are written to the file.
+def loadMap(fileName, writable=False):
+    with open(fileName, 'rb') as f:
+        header= f.read(HEADER.size)
+    if len(header) != HEADER.size:
+        raise Exception('Map file too short: ' + fileName)
+    magic, version, flags, width, height, sx, sy, gx, gy= HEADER.unpack(header)
+    if magic != MAGIC:
+        raise Exception('Not a map file: ' + fileName)
+    if version != VERSION:
+        raise Exception('Unsupported map file version: ' + str(version))
+    size= width * height
+    mode= 'r+' if writable else 'c'
+    obstacle= np.memmap(fileName, dtype=np.uint8, mode=mode, offset=HEADER.size, shape=(size,))
+    cost= None
+    if flags & FLAG_COSTS:
+        cost= np.memmap(fileName, dtype='<f8', mode=mode, offset=costOffset(size), shape=(size,))
+    return GridMap(width, height, obstacle, cost,
+                   (sx, sy) if sx >= 0 else None, (gx, gy) if gx >= 0 else None)
+
+#Read an occupancy image as 2D array of gray values (row 0 at the top).
+#Binary PGM files are memory-mapped, PNG files need Pillow.
+def readImage(fileName):
+    with open(fileName, 'rb') as f:
+        magic= f.read(2)
+    if magic in (b'P5', b'P2'):
+        return readPGM(fileName)
+    try:
+        from PIL import Image
+    except ImportError:
+        raise Exception('Image import needs Pillow (sudo apt install python3-pil)')
+    with Image.open(fileName) as image:
+        return np.asarray(image.convert('L'))
+
+#Read a PGM image (binary P5 or ASCII P2)
+def readPGM(fileName):
+    with open(fileName, 'rb') as f:
+        data= f.read(1024)
+    #Header: magic, width, height, maxval separated by whitespace and comments
+    tokens= []
+    pos= 0
+    while len(tokens) < 4:
+        while pos < len(data) and data[pos:pos + 1].isspace():
+            pos+= 1
+        if data[pos:pos + 1] == b'#':
+            pos= data.index(b'\n', pos)
+            continue
+        end= pos
+        while end < len(data) and not data[end:end + 1].isspace():
+            end+= 1
+        tokens.append(data[pos:end])
+        pos= end
+    magic, width, height, maxValue= tokens[0], int(tokens[1]), int(tokens[2]), int(tokens[3])
+    pos+= 1 #Single whitespace after maxval
+    if magic == b'P2':
+        with open(fileName, 'rb') as f:
+            f.seek(pos)
+            values= np.array(f.read().split(), dtype=np.int64)
+        image= values[:width * height].reshape(height, width)
+    else:
+        dtype= np.uint8 if maxValue < 256 else '>u2'
+        image= np.memmap(fileName, dtype=dtype, mode='r', offset=pos, shape=(height, width))
+    if maxValue != 255:
+        image= image * (255.0 / maxValue)
+    return image
+
+#Import an occupancy image: pixels darker than threshold are obstacles
+def importImage(fileName, threshold=128):
+    image= readImage(fileName)
+    height, width= image.shape
+    #Cell x,y is the pixel in column x and row height-1-y
+    obstacle= (image[::-1, :].T < threshold).astype(np.uint8).ravel()
+    return GridMap(width, height, obstacle)
+
+#Create a GridMap from the design of a DStarLiteEngine or ArrayDStarLite
+def mapFromEngine(engine):
+    if hasattr(engine, 'grid'):
+        grid= engine.grid
+        cost= np.array(grid.cost) if (grid.cost != 1).any() else None
+        start= tuple(engine.getStartCoordinates()) if engine.start is not None else None
+        goal= tuple(engine.getGoalCoordinates()) if engine.goal is not None else None
+        return GridMap(engine.width, engine.height, np.array(grid.obstacle), cost, start, goal)
+    gridMap= GridMap(engine.width, engine.height)
+    for node in engine.obstacles:
+        gridMap.setObstacle(node.x, node.y)
+    for node in engine.vertices():
+        if node.cost != 1:
+            gridMap.setCost(node.x, node.y, node.cost)
+    if engine.getStartCoordinates()[0] != float('inf'):
+        gridMap.start= tuple(engine.getStartCoordinates())
+    if engine.getGoalCoordinates()[0] != float('inf'):
+        gridMap.goal= tuple(engine.getGoalCoordinates())
+    return gridMap
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+    import time
+    fileName= os.path.join(tempfile.gettempdir(), 'site.dslm')
+    gridMap= GridMap(4000, 4000, start=(0, 0), goal=(3999, 3999))
+    gridMap.obstacle.reshape(4000, 4000)[2000, :3900]= 1
+    saveMap(gridMap, fileName)
+    startTime= time.time()
+    loaded= loadMap(fileName)
+    print('Loaded', loaded.width, 'x', loaded.height, 'in', round(time.time() - startTime, 4), 's',
+          'obstacles:', int(loaded.obstacle.sum()))
+    del loaded
+    os.remove(fileName)
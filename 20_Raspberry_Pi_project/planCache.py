@@ -0,0 +1,182 @@
+#!/usr/bin/python3
+############################################################
+# Class PlanCache
+# Robots often drive the same routes on a mostly static
+# map. PlanCache keeps the results of earlier plannings:
+# the path and optionally the planning state (snapshot of
+# DStarLiteEngine, i.e. the goal-rooted g-field with the
+# queue), so a repeated mission starts without search.
+# Key: content hash of the map (obstacles and terrain
+# costs), start, goal and connectivity. The hash is the
+# xor of the hashes of all cells which are obstacles or
+# have a cost other than 1, so it is updated for changed
+# cells without reading the whole map.
+# Entries are evicted in LRU order if the number of entries
+# or their size in bytes exceeds the limits.
+# When cells change during plan execution (mapChanged) the
+# entries of the old map whose path runs through a changed
+# cell are dropped. The other paths stay optimal if the
+# changes only make moves more expensive and are kept for
+# the new map (without planning state). Otherwise all
+# entries of the old map are dropped.
+#
+# File: planCache.py
+# Version: 1.0    Date: 18.10.2026
+###########################################################
+
+import collections
+import hashlib
+import struct
+
+#Estimated bytes of a path cell in an entry: coordinate tuple, list and set entry
+PATH_CELL_BYTES= 150
+ENTRY_BYTES= 500
+
+CELL= struct.Struct('<iiBd')
+
+#Hash of the state (isObstacle, cost) of cell x,y
+def cellHash(x, y, state):
+    digest= hashlib.blake2b(CELL.pack(x, y, 1 if state[0] else 0, state[1]), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+#True if a cell with this state does not change the hash (free, cost 1)
+def isDefault(state):
+    return not state[0] and state[1] == 1
+
+#Content hash of the grid of an engine (DStarLiteEngine)
+def mapHash(engine):
+    value= cellHash(engine.width, engine.height, (False, 0))
+    for node in engine.vertices():
+        if node.isObstacle or node.cost != 1:
+            value^= cellHash(node.x, node.y, (node.isObstacle, node.cost))
+    return value
+
+#Return the map hash after cell x,y changed from oldState to newState
+def updateHash(value, x, y, oldState, newState):
+    if not isDefault(oldState):
+        value^= cellHash(x, y, oldState)
+    if not isDefault(newState):
+        value^= cellHash(x, y, newState)
+    return value
+
+class CacheEntry(object):
+
+    #path: list of (x, y) from start to goal, state: snapshot or None
+    def __init__(self, path, cost, state=None):
+        self.path= path
+        self.cells= set(path)
+        self.cost= cost
+        self.state= state
+        self.size= ENTRY_BYTES + PATH_CELL_BYTES * len(path) + (len(state) if state else 0)
+
+
+class PlanCache(object):
+
+    #Keep at most maxEntries entries with together at most maxBytes bytes.
+    #storeStates: keep the planning state for replanning without a new search.
+    def __init__(self, maxEntries=32, maxBytes=64 * 1024 * 1024, storeStates=True):
+        self.maxEntries= maxEntries
+        self.maxBytes= maxBytes
+        self.storeStates= storeStates
+        self.entries= collections.OrderedDict() #key -> CacheEntry, oldest first
+        self.bytes= 0
+        self.hits= 0
+        self.misses= 0
+        self.evictions= 0
+        self.invalidations= 0
+
+    #Return the key of the actual design, start and goal of an engine
+    def key(self, engine):
+        return (mapHash(engine), tuple(engine.startCoordinates), tuple(engine.goalCoordinates),
+                engine.directNeighbors)
+
+    #Return the entry of key or None
+    def lookup(self, key):
+        entry= self.entries.get(key)
+        if entry is None:
+            self.misses+= 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits+= 1
+        return entry
+
+    #Store the plan of an engine after a successful planning
+    def store(self, key, engine):
+        if not engine.planReady:
+            return
+        state= engine.snapshot() if self.storeStates else None
+        entry= CacheEntry([(node.x, node.y) for node in engine.actualPath], engine.startNode.g, state)
+        if entry.size > self.maxBytes and state is not None:
+            entry= CacheEntry(entry.path, entry.cost) #Only the path fits
+        self.insert(key, entry)
+
+    #Insert an entry and evict the least recently used entries
+    def insert(self, key, entry):
+        self.remove(key)
+        self.entries[key]= entry
+        self.bytes+= entry.size
+        while len(self.entries) > self.maxEntries or \
+              (self.bytes > self.maxBytes and len(self.entries) > 1):
+            oldKey, oldEntry= self.entries.popitem(last=False)
+            self.bytes-= oldEntry.size
+            self.evictions+= 1
+
+    def remove(self, key):
+        entry= self.entries.pop(key, None)
+        if entry is not None:
+            self.bytes-= entry.size
+
+    #Use a cached plan in engine. With planning state the engine is restored
+    #and can replan, without it only the path is set. Return True if the
+    #planning state has been restored.
+    def restoreEntry(self, engine, entry):
+        if entry.state is not None:
+            engine.restore(entry.state)
+            return True
+        grid= engine.vertexGrid
+        engine.startNode= grid[entry.path[0][0]][entry.path[0][1]]
+        engine.lastNode= engine.startNode
+        engine.goalNode= grid[entry.path[-1][0]][entry.path[-1][1]]
+        engine.actualPath= [grid[x][y] for x, y in entry.path]
+        engine.planReady= True
+        for node in engine.actualPath[1:-1]:
+            engine.observer.updateColor(node, 'light blue')
+        return False
+
+    #Cells of the map of key changed: changes is a sequence of
+    #(x, y, oldState, newState) with states (isObstacle, cost).
+    #Update the entries of the old map and return the key of the new map.
+    def mapChanged(self, key, changes):
+        oldHash= key[0]
+        newHash= oldHash
+        cells= set()
+        onlyIncreases= True
+        for x, y, oldState, newState in changes:
+            if oldState == newState:
+                continue
+            newHash= updateHash(newHash, x, y, oldState, newState)
+            cells.add((x, y))
+            if (oldState[0] and not newState[0]) or (not newState[0] and newState[1] < oldState[1]):
+                onlyIncreases= False
+        if newHash == oldHash:
+            return key
+        for entryKey in [k for k in self.entries if k[0] == oldHash]:
+            entry= self.entries[entryKey]
+            self.remove(entryKey)
+            newKey= (newHash,) + entryKey[1:]
+            if onlyIncreases and cells.isdisjoint(entry.cells) and newKey not in self.entries:
+                #Path and cost stay valid, the planning state does not
+                self.insert(newKey, CacheEntry(entry.path, entry.cost))
+            else:
+                self.invalidations+= 1
+        return (newHash,) + key[1:]
+
+    def clear(self):
+        self.entries.clear()
+        self.bytes= 0
+
+    #Return statistics about the cache
+    def stats(self):
+        return {'entries': len(self.entries), 'bytes': self.bytes, 'hits': self.hits,
+                'misses': self.misses, 'evictions': self.evictions,
+                'invalidations': self.invalidations}
@@ -0,0 +1,133 @@
+#!/usr/bin/python3
+############################################################
+# Class PlanMetrics and event sinks
+# PlanMetrics counts the work of the planning algorithm
+# (expansions, vertex updates, heap operations, replans),
+# measures the time of the planning phases and sends
+# events to a pluggable sink:
+#   NullSink:       events are dropped (default)
+#   LoggingSink:    events are logged with a chosen level
+#   RingBufferSink: the last n events are kept in memory
+# Counters are cheap enough to stay enabled in production.
+# Events are only created if the sink is enabled.
+#
+# File: planMetrics.py
+# Version: 1.0    Date: 18.10.2026
+###########################################################
+
+import collections
+import logging
+import time
+
+#Names of the counters of PlanMetrics
+COUNTERS= ('expansions', 'vertexUpdates', 'heapPush', 'heapPop',
+           'heapUpdate', 'heapRemove', 'replans', 'jumpSteps')
+
+class NullSink(object):
+
+    enabled= False
+
+    def emit(self, timestamp, name, fields):
+        pass
+
+
+class LoggingSink(object):
+
+    #Log all events with the given level to the logger (default: "dstarlite")
+    def __init__(self, level=logging.DEBUG, logger=None):
+        self.logger= logger if logger is not None else logging.getLogger('dstarlite')
+        self.level= level
+        self.enabled= self.logger.isEnabledFor(level)
+
+    def emit(self, timestamp, name, fields):
+        self.logger.log(self.level, '%s %s', name, fields)
+
+
+class RingBufferSink(object):
+
+    enabled= True
+
+    #Keep the last capacity events as tuples (timestamp, name, fields)
+    def __init__(self, capacity=1000):
+        self.buffer= collections.deque(maxlen=capacity)
+
+    def emit(self, timestamp, name, fields):
+        self.buffer.append((timestamp, name, fields))
+
+    #Return the buffered events, oldest first
+    def events(self):
+        return list(self.buffer)
+
+    def clear(self):
+        self.buffer.clear()
+
+
+class _Phase(object):
+
+    #Context manager which adds the elapsed time to a phase of PlanMetrics
+    def __init__(self, metrics, name):
+        self.metrics= metrics
+        self.name= name
+
+    def __enter__(self):
+        self.startTime= time.perf_counter()
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        elapsed= time.perf_counter() - self.startTime
+        phases= self.metrics.phaseTimes
+        phases[self.name]= phases.get(self.name, 0.0) + elapsed
+        if self.metrics.tracing:
+            self.metrics.event(self.name, seconds=elapsed)
+        return False
+
+
+class PlanMetrics(object):
+
+    #Create new metrics with all counters at 0. sink receives the events.
+    def __init__(self, sink=None):
+        self.counters= dict.fromkeys(COUNTERS, 0)
+        self.phaseTimes= {}
+        self.setSink(sink)
+
+    #Set a new event sink. tracing is True if events are recorded.
+    def setSink(self, sink):
+        self.sink= sink if sink is not None else NullSink()
+        self.tracing= self.sink.enabled
+
+    #Increment a counter
+    def count(self, name, n=1):
+        self.counters[name]+= n
+
+    #Send an event to the sink. Callers in the hot path check tracing first.
+    def event(self, name, **fields):
+        if self.tracing:
+            self.sink.emit(time.time(), name, fields)
+
+    #Return a context manager which measures the time of a phase
+    def phase(self, name):
+        return _Phase(self, name)
+
+    #Return a copy of all counters and phase times
+    def snapshot(self):
+        result= dict(self.counters)
+        for name, seconds in self.phaseTimes.items():
+            result[name + 'Time']= seconds
+        return result
+
+    #Set all counters to 0 and clear the phase times. The dictionaries are
+    #changed in place: engines keep references to them in the hot path.
+    def reset(self):
+        self.counters.clear()
+        self.counters.update(dict.fromkeys(COUNTERS, 0))
+        self.phaseTimes.clear()
+
+if __name__ == "__main__":
+    sink= RingBufferSink(capacity=3)
+    metrics= PlanMetrics(sink)
+    with metrics.phase('computeShortestPath'):
+        for i in range(5):
+            metrics.count('expansions')
+            metrics.event('expand', x=i, y=0)
+    print(metrics.snapshot())
+    print(sink.events())
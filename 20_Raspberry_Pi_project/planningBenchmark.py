@@ -0,0 +1,363 @@
+#!/usr/bin/python3
+############################################################
+# Planning benchmark
+# Generate synthetic maps (random obstacles, mazes, rooms
+# with doors), run the initial ComputeShortestPath and a
+# scripted sequence of replannings with new obstacles on
+# the path like ScreenExecuter.executePlan and report
+# wall time, expansions (planSteps), queue operations
+# (see planMetrics.py) and peak memory as JSON lines. The output can be compared
+# across commits and backends.
+# With --reference the objects backend runs every scenario
+# a second time with another ComputeShortestPath variant and
+# the record gets its expansions and the reduction, e.g.
+# --algorithm "Jump points" --reference Basic.
+# --grid Sparse creates the vertices of the objects backend
+# on the first access: compare peakMemory on large maps.
+#
+# Usage example:
+#   python3 planningBenchmark.py --sizes 16,64,256 --maps random,maze
+#           --backends objects,arrays --output results.jsonl
+#
+# File: planningBenchmark.py
+# Version: 1.0    Date: 18.10.2026
+###########################################################
+
+import argparse
+import contextlib
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from DStarLiteEngine import DStarLiteEngine, algorithms, gridTypes
+from heuristics import heuristicTypes
+
+#### Map generators ##########################################################
+# Every generator returns a dictionary with width, height,
+# obstacles (set of (x, y)), start and goal (x, y).
+
+#Random obstacles with the given density
+def randomMap(size, seed, density=0.25):
+    rnd= random.Random(seed)
+    obstacles= set()
+    for x in range(size):
+        for y in range(size):
+            if rnd.random() < density:
+                obstacles.add((x, y))
+    return finishMap(size, obstacles, density)
+
+#A maze with corridors of width 1 (randomized depth first search)
+def mazeMap(size, seed, density=None):
+    rnd= random.Random(seed)
+    obstacles= set((x, y) for x in range(size) for y in range(size))
+    cells= (size + 1) // 2
+    visited= {(0, 0)}
+    stack= [(0, 0)]
+    obstacles.discard((0, 0))
+    while stack:
+        cx, cy= stack[-1]
+        candidates= [(cx + dx, cy + dy) for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1))
+                     if 0 <= cx + dx < cells and 0 <= cy + dy < cells and
+                     (cx + dx, cy + dy) not in visited]
+        if not candidates:
+            stack.pop()
+            continue
+        nx, ny= rnd.choice(candidates)
+        visited.add((nx, ny))
+        obstacles.discard((2 * nx, 2 * ny))
+        obstacles.discard((cx + nx, cy + ny))
+        stack.append((nx, ny))
+    return finishMap(size, obstacles, density)
+
+#Rooms separated by walls with one door per wall segment
+def roomsMap(size, seed, density=None, roomSize=8):
+    rnd= random.Random(seed)
+    obstacles= set()
+    for wall in range(roomSize, size, roomSize):
+        for i in range(size):
+            obstacles.add((wall, i))
+            obstacles.add((i, wall))
+    for wall in range(roomSize, size, roomSize):
+        for room in range(0, size, roomSize):
+            upper= min(room + roomSize, size)
+            if upper - room > 1:
+                obstacles.discard((wall, rnd.randrange(room + 1, upper)))
+                obstacles.discard((rnd.randrange(room + 1, upper), wall))
+    return finishMap(size, obstacles, density)
+
+#Start in the lower left, goal in the upper right corner
+def finishMap(size, obstacles, density):
+    start= (0, 0)
+    goal= (size - 1, size - 1)
+    obstacles.discard(start)
+    obstacles.discard(goal)
+    return {'width': size, 'height': size, 'obstacles': obstacles,
+            'start': start, 'goal': goal, 'density': density}
+
+mapGenerators= {'random': randomMap, 'maze': mazeMap, 'rooms': roomsMap}
+
+#### Backends ################################################################
+
+class ObjectBackend(object):
+
+    #DStarLiteEngine with a grid of Vertex objects
+    def __init__(self, aMap, directNeighbors, hIsZero, queueType='Indexed heap',
+                 vertexType='Standard', algorithm='Basic', heuristic=None, wavefront=False,
+                 gridType='Dense'):
+        self.engine= DStarLiteEngine(aMap['width'], aMap['height'], hIsZero, directNeighbors,
+                                     queueType=queueType, vertexType=vertexType,
+                                     algorithm=algorithm, heuristic=heuristic, gridType=gridType)
+        self.engine.useWavefront(wavefront)
+        for x, y in aMap['obstacles']:
+            self.engine.setObstacle(x, y)
+        self.engine.setStartCoordinates(*aMap['start'])
+        self.engine.setGoalCoordinates(*aMap['goal'])
+
+    def plan(self):
+        return self.engine.plan()
+
+    def path(self):
+        return [(node.x, node.y) for node in self.engine.actualPath]
+
+    def planSteps(self):
+        return self.engine.planSteps
+
+    def pathCost(self):
+        return self.engine.startNode.g
+
+    #Move the robot to x,y and put a new obstacle at nx,ny. Return if a plan exists.
+    def replan(self, x, y, nx, ny):
+        engine= self.engine
+        engine.startNode= engine.vertexGrid[x][y]
+        engine.setObstacle(nx, ny)
+        result= engine.replanning(engine.vertexGrid[nx][ny])
+        engine.showAndRemberPath()
+        return result and engine.planReady
+
+class ArrayBackend(object):
+
+    #ArrayDStarLite with NumPy arrays
+    def __init__(self, aMap, directNeighbors, hIsZero, queueType=None, vertexType=None,
+                 algorithm=None, heuristic=None, wavefront=False, gridType=None):
+        from arrayDStarLite import ArrayDStarLite
+        self.engine= ArrayDStarLite(aMap['width'], aMap['height'], hIsZero, directNeighbors)
+        self.engine.useWavefront(wavefront)
+        for x, y in aMap['obstacles']:
+            self.engine.setObstacle(x, y)
+        self.engine.setStartCoordinates(*aMap['start'])
+        self.engine.setGoalCoordinates(*aMap['goal'])
+
+    def plan(self):
+        return self.engine.plan()
+
+    def path(self):
+        return [tuple(c) for c in self.engine.pathCoordinates()]
+
+    def planSteps(self):
+        return self.engine.planSteps
+
+    def pathCost(self):
+        return float(self.engine.grid.g[self.engine.start])
+
+    def replan(self, x, y, nx, ny):
+        engine= self.engine
+        engine.start= engine.grid.cellId(x, y)
+        engine.setObstacle(nx, ny)
+        return engine.replanning(engine.grid.cellId(nx, ny))
+
+class HierarchicalBackend(object):
+
+    #HierarchicalPlanner: coarse grid of clusters, refined corridor
+    def __init__(self, aMap, directNeighbors, hIsZero, queueType=None, vertexType=None,
+                 algorithm=None, heuristic=None, wavefront=False, gridType=None):
+        from hierarchicalPlanner import HierarchicalPlanner
+        self.engine= HierarchicalPlanner(aMap['width'], aMap['height'], hIsZero, directNeighbors)
+        for x, y in aMap['obstacles']:
+            self.engine.setObstacle(x, y)
+        self.engine.setStartCoordinates(*aMap['start'])
+        self.engine.setGoalCoordinates(*aMap['goal'])
+
+    #Only the first window of the path is refined
+    def plan(self):
+        return self.engine.plan()
+
+    def path(self):
+        return list(self.engine.actualPath)
+
+    def planSteps(self):
+        return self.engine.planSteps
+
+    #Refine the complete path for its cost
+    def pathCost(self):
+        self.engine.completePath()
+        return self.engine.pathCost()
+
+    def replan(self, x, y, nx, ny):
+        self.engine.setStartCoordinates(x, y)
+        return self.engine.replanning(nx, ny)
+
+backends= {'objects': ObjectBackend, 'arrays': ArrayBackend, 'hierarchical': HierarchicalBackend}
+
+#### Benchmark ###############################################################
+
+#Plan on a map and replan a number of times: the robot drives advance
+#steps on the path, then a new obstacle appears on the next vertex.
+#Return a dictionary with the results.
+def runScenario(backendName, aMap, directNeighbors, hIsZero, replans, advance,
+                queueType, vertexType, algorithm='Basic', heuristic=None, wavefront=False,
+                gridType='Dense'):
+    result= {}
+    startTime= time.perf_counter()
+    backend= backends[backendName](aMap, directNeighbors, hIsZero, queueType, vertexType,
+                                   algorithm, heuristic, wavefront, gridType)
+    result['setupTime']= time.perf_counter() - startTime
+    startTime= time.perf_counter()
+    planReady= backend.plan()
+    result['planTime']= time.perf_counter() - startTime
+    result['planSteps']= backend.planSteps()
+    result['pathCost']= backend.pathCost() if planReady else None
+    result['replanTimes']= []
+    result['replanSteps']= []
+    path= backend.path()
+    position= 0
+    for i in range(replans):
+        if not planReady:
+            break
+        position= min(position + advance, len(path) - 3)
+        if position < 0:
+            break
+        x, y= path[position]
+        nx, ny= path[position + 1]
+        startTime= time.perf_counter()
+        planReady= backend.replan(x, y, nx, ny)
+        result['replanTimes'].append(time.perf_counter() - startTime)
+        result['replanSteps'].append(backend.planSteps())
+        path= backend.path()
+        position= 0
+    result['planReady']= planReady
+    result['finalPathCost']= backend.pathCost() if planReady else None
+    result['metrics']= backend.engine.metrics.snapshot()
+    result['totalTime']= result['planTime'] + sum(result['replanTimes'])
+    result['totalSteps']= result['planSteps'] + sum(result['replanSteps'])
+    return result
+
+#Run a scenario again with tracemalloc and return the peak memory in bytes
+def peakMemory(backendName, aMap, directNeighbors, hIsZero, replans, advance,
+               queueType, vertexType, algorithm='Basic', heuristic=None, wavefront=False,
+               gridType='Dense'):
+    tracemalloc.start()
+    try:
+        runScenario(backendName, aMap, directNeighbors, hIsZero, replans, advance,
+                    queueType, vertexType, algorithm, heuristic, wavefront, gridType)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+#Return the actual git commit or None
+def gitCommit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       cwd=os.path.dirname(os.path.abspath(__file__)),
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def parseArguments(argv):
+    parser= argparse.ArgumentParser(description='D* Lite planning benchmark')
+    parser.add_argument('--sizes', default='16,32,64',
+                        help='comma separated grid sizes (16 ... 2048)')
+    parser.add_argument('--maps', default='random,maze,rooms',
+                        help='comma separated map types: ' + ','.join(mapGenerators))
+    parser.add_argument('--densities', default='0.2',
+                        help='comma separated obstacle densities of random maps')
+    parser.add_argument('--backends', default='objects',
+                        help='comma separated backends: ' + ','.join(backends))
+    parser.add_argument('--queue', default='Indexed heap',
+                        help='priority queue of the objects backend')
+    parser.add_argument('--vertex', default='Standard',
+                        help='vertex type of the objects backend')
+    parser.add_argument('--algorithm', default='Basic',
+                        help='ComputeShortestPath variant of the objects backend: ' +
+                             ','.join(algorithms))
+    parser.add_argument('--reference', default=None,
+                        help='ComputeShortestPath variant of a reference run of the objects '
+                             'backend: report its expansions and the reduction')
+    parser.add_argument('--heuristic', default=None,
+                        help='heuristic of the objects backend: ' + ','.join(heuristicTypes) +
+                             ' (default: Manhattan for 4, Octile for 8 neighbors)')
+    parser.add_argument('--wavefront', action='store_true',
+                        help='bootstrap the first search with a NumPy wavefront '
+                             '(objects and arrays backends)')
+    parser.add_argument('--grid', default='Dense',
+                        help='storage of the vertices of the objects backend: ' +
+                             ','.join(gridTypes))
+    parser.add_argument('--neighbors', type=int, choices=(4, 8), default=8)
+    parser.add_argument('--h0', action='store_true', help='use h = 0')
+    parser.add_argument('--replans', type=int, default=5)
+    parser.add_argument('--advance', type=int, default=3,
+                        help='steps of the robot between replannings')
+    parser.add_argument('--seeds', default='1', help='comma separated random seeds')
+    parser.add_argument('--no-memory', action='store_true',
+                        help='do not measure peak memory (second run with tracemalloc)')
+    parser.add_argument('--output', default=None, help='append JSON lines to this file')
+    return parser.parse_args(argv)
+
+def main(argv):
+    args= parseArguments(argv)
+    commit= gitCommit()
+    output= open(args.output, 'a') if args.output else sys.stdout
+    directNeighbors= args.neighbors == 4
+    try:
+        for size in [int(s) for s in args.sizes.split(',')]:
+            for mapType in args.maps.split(','):
+                densities= [float(d) for d in args.densities.split(',')] \
+                           if mapType == 'random' else [None]
+                for density in densities:
+                    for seed in [int(s) for s in args.seeds.split(',')]:
+                        if density is None:
+                            aMap= mapGenerators[mapType](size, seed)
+                        else:
+                            aMap= mapGenerators[mapType](size, seed, density)
+                        for backendName in args.backends.split(','):
+                            scenario= (backendName, aMap, directNeighbors, args.h0,
+                                       args.replans, args.advance, args.queue, args.vertex,
+                                       args.algorithm, args.heuristic, args.wavefront,
+                                       args.grid)
+                            with open(os.devnull, 'w') as devnull, \
+                                 contextlib.redirect_stdout(devnull):
+                                result= runScenario(*scenario)
+                                memory= None if args.no_memory else peakMemory(*scenario)
+                                reference= None
+                                if args.reference and backendName == 'objects':
+                                    reference= runScenario(*(scenario[:8] + (args.reference,) +
+                                                             scenario[9:]))
+                            record= {'commit': commit, 'backend': backendName,
+                                     'queue': args.queue if backendName == 'objects' else None,
+                                     'vertex': args.vertex if backendName == 'objects' else None,
+                                     'algorithm': args.algorithm if backendName == 'objects' else None,
+                                     'heuristic': args.heuristic if backendName == 'objects' else None,
+                                     'grid': args.grid if backendName == 'objects' else None,
+                                     'map': mapType, 'size': size, 'density': density,
+                                     'seed': seed, 'neighbors': args.neighbors,
+                                     'h0': args.h0, 'wavefront': args.wavefront,
+                                     'peakMemory': memory}
+                            record.update(result)
+                            if reference is not None:
+                                record['reference']= args.reference
+                                record['referenceSteps']= reference['totalSteps']
+                                record['referenceTime']= reference['totalTime']
+                                record['referencePathCost']= reference['finalPathCost']
+                                record['expansionReduction']= \
+                                    1 - result['totalSteps'] / reference['totalSteps'] \
+                                    if reference['totalSteps'] else None
+                            output.write(json.dumps(record) + '\n')
+                            output.flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
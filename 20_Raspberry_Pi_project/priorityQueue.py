@@ -1,14 +1,21 @@
 #!/usr/bin/python3
 ############################################################
-# Class PriorityQueue
-# This class implements a priority queue for the 
-# planning algorithm D*Lite. If the queue is not
+# Classes PriorityQueue, IndexedPriorityQueue and
+# LazyPriorityQueue
+# These classes implement priority queues for the 
+# planning algorithm D*Lite. If a queue is not
 # empty then the first element (index=0) has the
 # smallest key-value of all elements.
+# PriorityQueue is the simple reference implementation,
+# IndexedPriorityQueue keeps the heap position of every
+# vertex and supports contains, update and remove
+# in O(1)/O(log n). LazyPriorityQueue never removes
+# eagerly: outdated entries are skipped when they reach
+# the top and the heap is compacted from time to time.
 #
 # File: priorityQueue.py
 # Author: Detlef Heinze 
-# Version: 1.0    Date: 22.07.2020       
+# Version: 1.2    Date: 18.10.2026       
 ###########################################################
 import heapq
 import vertex as vertex
@@ -46,19 +53,295 @@ class PriorityQueue:
         if self.empty():
             return (float('inf'),float('inf'))
         else:
-           #print('Elements:', self.elements)
-           return heapq.nsmallest(1, self.elements)[0][0]
+           #The heap invariant keeps the smallest element at index 0
+           return self.elements[0][0]
+
+    #Return the smallest item without removing it. The queue must not be empty.
+    def top(self):
+        return self.elements[0][1]
     
     #Remove an element from the queue
     def remove(self, node):
         self.elements = [e for e in self.elements if e[1] != node]
         heapq.heapify(self.elements)
+
+    #Set a new key for an element which is already in the queue
+    def update(self, node, calculatedKey):
+        self.remove(node)
+        self.insert(node, calculatedKey)
+
+    #Return True, if the node is in the queue
+    def contains(self, node):
+        return node in self
+
+    #Return statistics about the queue content
+    def stats(self):
+        return {'type': 'Reference', 'live': len(self.elements), 
+                'stale': 0, 'compactions': 0}
+
+    #Return a list of (key, item) pairs of all elements
+    def entries(self):
+        return [(key, node) for key, node in self.elements]
         
     #Iterator
     def __iter__(self):
        for key, node in self.elements:
             yield node
 
+
+class IndexedPriorityQueue:
+
+    #Initialize a new instance. The heap contains [key, item] lists,
+    #positions maps every item to its index in the heap.
+    def __init__(self):
+        self.elements = []
+        self.positions = {}
+
+    #Return True, if the queue is empty
+    def empty(self):
+        return len(self.elements) == 0
+
+    #Return the number of elements    
+    def count(self):
+        return len(self.elements)
+
+    #Insert a new item with the calculated key into the queue.
+    #If the item is already in the queue its key is updated.
+    def insert(self, item, calculatedKey):
+        if item in self.positions:
+            self.update(item, calculatedKey)
+        else:
+            self.elements.append([calculatedKey, item])
+            self.positions[item] = len(self.elements) - 1
+            self._siftUp(len(self.elements) - 1)
+
+    #Pop and return the smallest item in the queue
+    def pop(self):
+        element = self.elements[0]
+        last = self.elements.pop()
+        del self.positions[element[1]]
+        if self.elements:
+            self.elements[0] = last
+            self.positions[last[1]] = 0
+            self._siftDown(0)
+        return element[1]
+
+    #Return the key of the first element in the queue
+    #If the priority queue is empty return key with inf-values.
+    def top_key(self):
+        if self.empty():
+            return (float('inf'),float('inf'))
+        else:
+            return self.elements[0][0]
+
+    #Return the smallest item without removing it. The queue must not be empty.
+    def top(self):
+        return self.elements[0][1]
+
+    #Remove an element from the queue. Nothing happens if the
+    #element is not in the queue.
+    def remove(self, node):
+        index = self.positions.pop(node, None)
+        if index is None:
+            return
+        last = self.elements.pop()
+        if index < len(self.elements):
+            self.elements[index] = last
+            self.positions[last[1]] = index
+            self._siftUp(index)
+            self._siftDown(self.positions[last[1]])
+
+    #Set a new key for an element which is already in the queue
+    def update(self, node, calculatedKey):
+        index = self.positions[node]
+        oldKey = self.elements[index][0]
+        self.elements[index][0] = calculatedKey
+        if calculatedKey < oldKey:
+            self._siftUp(index)
+        else:
+            self._siftDown(index)
+
+    #Return True, if the node is in the queue
+    def contains(self, node):
+        return node in self.positions
+
+    def __contains__(self, node):
+        return node in self.positions
+
+    #Return statistics about the queue content
+    def stats(self):
+        return {'type': 'Indexed heap', 'live': len(self.elements), 
+                'stale': 0, 'compactions': 0}
+
+    #Return a list of (key, item) pairs of all elements
+    def entries(self):
+        return [(key, node) for key, node in self.elements]
+
+    #Iterator
+    def __iter__(self):
+        for key, node in self.elements:
+            yield node
+
+    #Move the element at index towards the root until the heap
+    #invariant holds again
+    def _siftUp(self, index):
+        elements = self.elements
+        positions = self.positions
+        element = elements[index]
+        key = element[0]
+        while index > 0:
+            parentIndex = (index - 1) >> 1
+            parent = elements[parentIndex]
+            if key < parent[0]:
+                elements[index] = parent
+                positions[parent[1]] = index
+                index = parentIndex
+            else:
+                break
+        elements[index] = element
+        positions[element[1]] = index
+
+    #Move the element at index towards the leaves until the heap
+    #invariant holds again
+    def _siftDown(self, index):
+        elements = self.elements
+        positions = self.positions
+        size = len(elements)
+        element = elements[index]
+        key = element[0]
+        while True:
+            childIndex = 2 * index + 1
+            if childIndex >= size:
+                break
+            rightIndex = childIndex + 1
+            if rightIndex < size and elements[rightIndex][0] < elements[childIndex][0]:
+                childIndex = rightIndex
+            child = elements[childIndex]
+            if child[0] < key:
+                elements[index] = child
+                positions[child[1]] = index
+                index = childIndex
+            else:
+                break
+        elements[index] = element
+        positions[element[1]] = index
+
+
+class LazyPriorityQueue:
+
+    #Initialize a new instance. The heap contains (key, stamp, item) tuples.
+    #stamps maps every item in the queue to the stamp of its only valid
+    #heap entry. All other entries of the item are stale and skipped.
+    #The heap is compacted if the share of stale entries exceeds
+    #staleThreshold and the heap has at least minCompactSize entries.
+    def __init__(self, staleThreshold=0.5, minCompactSize=64):
+        self.elements = []
+        self.stamps = {}
+        self.nextStamp = 0
+        self.staleThreshold = staleThreshold
+        self.minCompactSize = minCompactSize
+        self.compactions = 0
+
+    #Return True, if the queue is empty
+    def empty(self):
+        return len(self.stamps) == 0
+
+    #Return the number of (live) elements    
+    def count(self):
+        return len(self.stamps)
+
+    #Insert a new item with the calculated key into the queue.
+    #If the item is already in the queue its old entry becomes stale.
+    def insert(self, item, calculatedKey):
+        stamp = self.nextStamp
+        self.nextStamp += 1
+        self.stamps[item] = stamp
+        heapq.heappush(self.elements, (calculatedKey, stamp, item))
+        self._compactIfNeeded()
+
+    #Pop and return the smallest item in the queue
+    def pop(self):
+        self._dropStaleTop()
+        key, stamp, item = heapq.heappop(self.elements)
+        del self.stamps[item]
+        return item
+
+    #Return the key of the first element in the queue
+    #If the priority queue is empty return key with inf-values.
+    def top_key(self):
+        self._dropStaleTop()
+        if self.empty():
+            return (float('inf'),float('inf'))
+        else:
+            return self.elements[0][0]
+
+    #Return the smallest item without removing it. The queue must not be empty.
+    def top(self):
+        self._dropStaleTop()
+        return self.elements[0][2]
+
+    #Remove an element from the queue. Its heap entry only becomes stale.
+    def remove(self, node):
+        if self.stamps.pop(node, None) is not None:
+            self._compactIfNeeded()
+
+    #Set a new key for an element which is already in the queue
+    def update(self, node, calculatedKey):
+        self.insert(node, calculatedKey)
+
+    #Return True, if the node is in the queue
+    def contains(self, node):
+        return node in self.stamps
+
+    def __contains__(self, node):
+        return node in self.stamps
+
+    #Return statistics about the queue content
+    def stats(self):
+        return {'type': 'Lazy deletion', 'live': len(self.stamps), 
+                'stale': len(self.elements) - len(self.stamps), 
+                'compactions': self.compactions}
+
+    #Return a list of (key, item) pairs of the live elements
+    def entries(self):
+        stamps = self.stamps
+        return [(key, node) for key, stamp, node in self.elements
+                if stamps.get(node) == stamp]
+
+    #Iterator over the live elements
+    def __iter__(self):
+        for node in self.stamps:
+            yield node
+
+    #Remove stale entries from the top of the heap
+    def _dropStaleTop(self):
+        elements = self.elements
+        stamps = self.stamps
+        while elements and stamps.get(elements[0][2]) != elements[0][1]:
+            heapq.heappop(elements)
+
+    #Rebuild the heap without stale entries if there are too many of them
+    def _compactIfNeeded(self):
+        size = len(self.elements)
+        if size >= self.minCompactSize and \
+           size - len(self.stamps) > self.staleThreshold * size:
+            stamps = self.stamps
+            self.elements = [e for e in self.elements if stamps.get(e[2]) == e[1]]
+            heapq.heapify(self.elements)
+            self.compactions += 1
+
+
+#Available priority queue implementations for the planner
+queueTypes = {'Indexed heap': IndexedPriorityQueue,
+              'Lazy deletion': LazyPriorityQueue,
+              'Reference': PriorityQueue}
+
+#Create a new priority queue of the given type
+def createPriorityQueue(queueType='Indexed heap'):
+    if queueType not in queueTypes:
+        raise Exception('Unknown priority queue type: ' + str(queueType))
+    return queueTypes[queueType]()
+
 if __name__ == "__main__":
     pq= PriorityQueue()
     a=vertex.Vertex()
@@ -74,4 +357,20 @@ if __name__ == "__main__":
     bPop= pq.pop()
     print(bPop.rsh)
     print(pq.empty())
+
+    ipq= IndexedPriorityQueue()
+    ipq.insert(b,(1,1))
+    ipq.insert(a,(2,2))
+    ipq.update(a,(0,0))
+    print('Contains a:', a in ipq, 'TopKey:', ipq.top_key())
+    ipq.remove(a)
+    print('Contains a:', a in ipq, 'TopKey:', ipq.top_key())
+
+    lpq= LazyPriorityQueue()
+    lpq.insert(b,(1,1))
+    lpq.insert(a,(2,2))
+    lpq.update(a,(0,0))
+    print('Stats:', lpq.stats(), 'TopKey:', lpq.top_key())
+    lpq.remove(a)
+    print('Stats:', lpq.stats(), 'TopKey:', lpq.top_key())
     
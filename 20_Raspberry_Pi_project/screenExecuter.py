@@ -59,18 +59,21 @@ class ScreenExecuter(object):
                     result, reply= self.orientRobotTo(nextVertex)
                     self.view.master.update()
                     self.delay()
-                    if nextVertex.isObstacle or self.robotReportsObstacle():
-                        # New obstacle occupies nextVertex on path!!! Replanning!!!
-                        # New obstacles besides the path are not considered
-                        # because the robot does not see them.
-                        print('\nNew obstacle at', nextVertex.x, nextVertex.y)
-                        if self.robotReportsObstacle() and not nextVertex.isObstacle:
-                            nextVertex.isObstacle= True
-                            self.planner.obstacles.add(nextVertex)
-                            self.view.updateColor(nextVertex, 'brown')
+                    # Changes clicked since the last step and an obstacle
+                    # reported by the robot are applied as one batch.
+                    blocked, freed, costs= self.view.takePendingChanges()
+                    if (nextVertex.isObstacle or self.robotReportsObstacle()) and \
+                       nextVertex not in blocked:
+                        # New obstacle occupies nextVertex on path!!! 
+                        blocked.append(nextVertex)
+                        self.view.updateColor(nextVertex, 'brown')
+                    if blocked or freed or costs:
+                        # Replanning!!!
+                        print('\nNew obstacles at', [(v.x, v.y) for v in blocked])
+                        print('Removed obstacles at', [(v.x, v.y) for v in freed])
+                        print('New terrain costs', [(v.x, v.y, c) for v, c in costs])
                         print('Replanning!')
-                        self.planner.clearOldPath(step)
-                        abort= not self.planner.replanning(nextVertex)
+                        abort= not self.planner.applyChanges(blocked, freed, costs)
                         self.planner.showAndRemberPath()
                         replanned=True
                         print('Replanning done\n')
@@ -0,0 +1,127 @@
+#!/usr/bin/python3
+############################################################
+# Classes SparseVertexGrid and SparseAdjacency
+# The dense grid of DStarLiteEngine creates a vertex for
+# every cell. On large, mostly unexplored maps (outdoor
+# sites) the search touches only a small region of them.
+# SparseVertexGrid creates the vertex of a cell on the first
+# access vertexGrid[x][y]. A cell without vertex has the
+# defaults of a new vertex: g = rsh = inf, no obstacle,
+# cost 1. The grid is a dictionary x -> column, a column a
+# dictionary y -> vertex, so the access to an existing
+# vertex costs two dictionary lookups. SparseAdjacency
+# creates the neighbor table of a vertex in the same way
+# (see DStarLiteEngine.buildAdjacency).
+# The memory scales with the searched region, creating a
+# grid is O(1). Iterating the grid or a column visits every
+# cell like the lists of the dense grid and creates all
+# vertices: vertices() returns only the created ones.
+#
+# File: sparseGrid.py
+# Version: 1.0    Date: 18.10.2026
+###########################################################
+
+class SparseVertexGrid(dict):
+
+    #Grid of gridWidth x gridHeight cells, the vertices are objects of
+    #vertexClass (see vertex.vertexTypes)
+    def __init__(self, vertexClass, gridWidth, gridHeight):
+        dict.__init__(self)
+        self.vertexClass= vertexClass
+        self.width= gridWidth
+        self.height= gridHeight
+
+    #Create column x on the first access
+    def __missing__(self, x):
+        if not 0 <= x < self.width:
+            raise IndexError('Column ' + str(x) + ' is outside of the grid')
+        column= _SparseColumn(self, x)
+        self[x]= column
+        return column
+
+    #Visit all columns like the list of columns of the dense grid
+    def __iter__(self):
+        for x in range(self.width):
+            yield self[x]
+
+    def __len__(self):
+        return self.width
+
+    #Return the created vertices
+    def vertices(self):
+        for column in self.values():
+            yield from column.values()
+
+    #Return the number of created vertices
+    def vertexCount(self):
+        return sum(dict.__len__(column) for column in self.values())
+
+
+class _SparseColumn(dict):
+
+    def __init__(self, grid, x):
+        dict.__init__(self)
+        self.grid= grid
+        self.x= x
+
+    #Create the vertex x,y on the first access
+    def __missing__(self, y):
+        grid= self.grid
+        if not 0 <= y < grid.height:
+            raise IndexError('Row ' + str(y) + ' is outside of the grid')
+        node= grid.vertexClass(self.x, y)
+        self[y]= node
+        return node
+
+    def __iter__(self):
+        for y in range(self.grid.height):
+            yield self[y]
+
+    def __len__(self):
+        return self.grid.height
+
+
+class SparseAdjacency(dict):
+
+    #Neighbor table of a SparseVertexGrid: adjacency[x][y] is the tuple of
+    #(neighbor, cost) pairs of vertex x,y for the moves (dx, dy, cost)
+    def __init__(self, grid, moves):
+        dict.__init__(self)
+        self.grid= grid
+        self.moves= moves
+
+    def __missing__(self, x):
+        if not 0 <= x < self.grid.width:
+            raise IndexError('Column ' + str(x) + ' is outside of the grid')
+        column= _AdjacencyColumn(self, x)
+        self[x]= column
+        return column
+
+
+class _AdjacencyColumn(dict):
+
+    def __init__(self, adjacency, x):
+        dict.__init__(self)
+        self.adjacency= adjacency
+        self.x= x
+
+    #Create the neighbor table of vertex x,y on the first access.
+    #The neighbors are created with it.
+    def __missing__(self, y):
+        grid= self.adjacency.grid
+        if not 0 <= y < grid.height:
+            raise IndexError('Row ' + str(y) + ' is outside of the grid')
+        x= self.x
+        width= grid.width
+        height= grid.height
+        table= tuple((grid[x + dx][y + dy], cost) for dx, dy, cost in self.adjacency.moves
+                     if 0 <= x + dx < width and 0 <= y + dy < height)
+        self[y]= table
+        return table
+
+if __name__ == "__main__":
+    from vertex import Vertex
+    grid= SparseVertexGrid(Vertex, 100000, 100000)
+    adjacency= SparseAdjacency(grid, ((-1, 0, 1), (1, 0, 1), (0, -1, 1), (0, 1, 1)))
+    print('Neighbors of 0,5:', [(n.x, n.y) for n, cost in adjacency[0][5]])
+    print('Created vertices:', grid.vertexCount(), 'of', grid.width * grid.height)
@@ -1,16 +1,27 @@
 #!/usr/bin/python3
 ############################################################
-# Class Vertex
+# Classes Vertex and SlottedVertex
 # The class Vertex represents a single vertex in the path-
 # planning algorithm D*Lite. A vertex is a field in the
 # matrix of the area where the robot drives.
+# SlottedVertex has the same interface but uses __slots__,
+# caches the heuristic value for the last start vertex and
+# only creates a new key tuple if the key has changed.
+# The heuristic is an object of heuristics.py.
 #
 # File: vertex.py
 # Author: Detlef Heinze 
-# Version: 1.0    Date: 22.07.2020       
+# Version: 1.1    Date: 18.10.2026       
 ###########################################################
 
-import math as math
+INF= float('inf')
+INF_KEY= (INF, INF)
+#The first key component is rounded to multiples of 2**-30 by adding and
+#subtracting KEY_ROUNDING: sums of the same costs in another order differ
+#in the last bits, e.g. 1.4+1.4+1.4 and 3+1.2. With an exact heuristic like
+#octile such a difference can stop ComputeShortestPath before the start
+#vertex has its final g-value.
+KEY_ROUNDING= 2.0 ** 22
 
 class Vertex(object):
 
@@ -22,6 +33,7 @@ class Vertex(object):
                                  #if g !=rsh then vertex is inconsistent
         self.isGoal= False
         self.isObstacle= False
+        self.cost= 1             #Terrain cost factor (>= 1) of the vertex
         self.key=0 
     
     #If vertex is a goal then set rsh value to 0 otherwise to infinite
@@ -40,26 +52,18 @@ class Vertex(object):
     
     #CalculateKey function of the D*Lite algorithm
     #Return the calculated key for sorting.
-    def calculateKey(self, startNode, k, hIsZero, directNeighbors):
+    def calculateKey(self, startNode, k, heuristic):
         if self.g < self.rsh:
             min1= self.g
         else: 
             min1= self.rsh 
-        self.key= (min1 + self.h(startNode, hIsZero, directNeighbors) + k, min1)
+        self.key= (min1 + heuristic.h(self, startNode) + k + KEY_ROUNDING - KEY_ROUNDING, min1)
         return self.key
 
 
     #Calculate the heuristic-value of the vertex
-    def h(self, startNode, hIsZero=True, directNeighbors=False):
-        if hIsZero:
-            #Do not use a heuristic. Then more planning steps are needed
-            return 0
-        elif directNeighbors:
-            #max. 4 neighbors, use exact distance without considering obstacles
-            return abs(self.x - startNode.x) + abs(self.y -startNode.y)
-        else:
-            #max. eight neighbors: use euklidic distance
-            return math.sqrt(math.pow(self.x - startNode.x,2) + math.pow(self.y -startNode.y,2))
+    def h(self, startNode, heuristic):
+        return heuristic.h(self, startNode)
 
     #Define a "<"  operator for comparision of two vertices
     def __lt__(self, anotherVertex):
@@ -71,10 +75,88 @@ class Vertex(object):
               'rsh:', self.rsh, 'IsGoal:', self.isGoal, 
               'IsObstacle:', self.isObstacle)
 
+class SlottedVertex(object):
+
+    __slots__ = ('x', 'y', 'g', 'rsh', 'isGoal', 'isObstacle', 'cost', 'key',
+                 'hStart', 'hSource', 'hValue')
+
+    def __init__(self,x=0, y=0):
+        self.x=x    #x-ccordinate in the vertexGrid (not canvas)
+        self.y=y    #y-coordinate in the vertexGrid (not canvas)
+        self.g= INF     #Estimated cost to goal
+        self.rsh= INF   #Sum of costs to goal so far
+                        #if g !=rsh then vertex is inconsistent
+        self.isGoal= False
+        self.isObstacle= False
+        self.cost= 1       #Terrain cost factor (>= 1) of the vertex
+        self.key= INF_KEY
+        self.hStart= None  #Start vertex of the cached heuristic value
+        self.hSource= None #Heuristic of the cached value
+        self.hValue= 0
+
+    #If vertex is a goal then set rsh value to 0 otherwise to infinite
+    def setIsGoal(self, aBool):
+        self.isGoal = aBool
+        if aBool:
+            self.rsh= 0
+        else:
+            self.rsh= INF
+
+    #If vertex is an obstacle set rsh to infinite
+    def setIsObstacle(self,aBool):
+        self.isObstacle = aBool
+        if aBool:
+            self.rsh= INF
+
+    #CalculateKey function of the D*Lite algorithm
+    #Return the calculated key for sorting. The old key tuple is
+    #returned if nothing has changed.
+    def calculateKey(self, startNode, k, heuristic):
+        g= self.g
+        rsh= self.rsh
+        min1= g if g < rsh else rsh
+        if startNode is self.hStart and heuristic is self.hSource:
+            key1= min1 + self.hValue + k + KEY_ROUNDING - KEY_ROUNDING
+        else:
+            key1= min1 + self.h(startNode, heuristic) + k + KEY_ROUNDING - KEY_ROUNDING
+        key= self.key
+        if key[0] != key1 or key[1] != min1:
+            key= self.key= (key1, min1)
+        return key
+
+    #Calculate the heuristic-value of the vertex. The value is
+    #cached until the start vertex or the heuristic changes.
+    def h(self, startNode, heuristic):
+        if startNode is self.hStart and heuristic is self.hSource:
+            return self.hValue
+        value= heuristic.h(self, startNode)
+        self.hStart= startNode
+        self.hSource= heuristic
+        self.hValue= value
+        return value
+
+    #Define a "<"  operator for comparision of two vertices
+    def __lt__(self, anotherVertex):
+        return self.key < anotherVertex.key
+
+    def print(self):
+        print('x:', self.x, 'y:', self.y, 'g:', self.g, 
+              'rsh:', self.rsh, 'IsGoal:', self.isGoal, 
+              'IsObstacle:', self.isObstacle)
+
+
+#Available vertex implementations for the planner
+vertexTypes = {'Standard': Vertex,
+               'Slotted': SlottedVertex}
+
 if __name__ == "__main__":
+    from heuristics import EuclideanHeuristic
     s=Vertex()
     s.print()
     s.setIsGoal(True)
     s.print()
     s2=Vertex()
     print(s<s2)
+    s3=SlottedVertex(3,4)
+    euclidean= EuclideanHeuristic()
+    print(s3.calculateKey(s3, 0, euclidean) is s3.calculateKey(s3, 0, euclidean))
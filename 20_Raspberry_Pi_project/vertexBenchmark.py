@@ -0,0 +1,69 @@
+#!/usr/bin/python3
+############################################################
+# Vertex benchmark
+# Compare memory and throughput of the vertex
+# implementations Vertex and SlottedVertex (see
+# vertex.vertexTypes): memory of a vertex grid, speed
+# of calculateKey and time of a headless plan with
+# DStarLiteEngine.
+#
+# Usage: python3 vertexBenchmark.py [gridSize]
+#
+# File: vertexBenchmark.py
+# Version: 1.0    Date: 18.10.2026
+###########################################################
+
+import contextlib
+import os
+import sys
+import time
+import tracemalloc
+import vertex as vertex
+from heuristics import EuclideanHeuristic
+from DStarLiteEngine import DStarLiteEngine
+
+#Return the memory in bytes needed by a grid of vertices
+def gridMemory(vertexClass, size):
+    tracemalloc.start()
+    grid= [[vertexClass(x,y) for y in range(size)] for x in range(size)]
+    memory= tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del grid
+    return memory
+
+#Return the number of calculateKey calls per second
+def keyThroughput(vertexClass, calls=200000):
+    start= vertexClass(0, 0)
+    heuristic= EuclideanHeuristic()
+    vertices= [vertexClass(x, x % 7) for x in range(100)]
+    for v in vertices:
+        v.g= v.x
+        v.rsh= v.x + 1
+    startTime= time.perf_counter()
+    for i in range(calls // len(vertices)):
+        for v in vertices:
+            v.calculateKey(start, 0.0, heuristic)
+    return calls / (time.perf_counter() - startTime)
+
+#Return the time of a headless plan around a wall on a size x size grid
+def planTime(vertexType, size):
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        engine= DStarLiteEngine(size, size, hIsZero=False, directNeighbors=False,
+                                vertexType=vertexType)
+        for y in range(size - 2):
+            engine.setObstacle(size // 2, y)
+        engine.setStartCoordinates(0, 0)
+        engine.setGoalCoordinates(size - 1, 0)
+        startTime= time.perf_counter()
+        engine.plan()
+        return time.perf_counter() - startTime, engine.planSteps
+
+if __name__ == "__main__":
+    size= int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    print('Vertex benchmark with grid size', size, 'x', size)
+    for name, vertexClass in vertex.vertexTypes.items():
+        memory= gridMemory(vertexClass, size)
+        throughput= keyThroughput(vertexClass)
+        seconds, steps= planTime(name, size)
+        print('%-9s memory/vertex: %6.1f bytes  calculateKey: %9.0f calls/s  plan: %.3f s (%d steps)'
+              % (name, memory / (size * size), throughput, seconds, steps))